@@ -11,6 +11,8 @@ CONTROL_DROP  = [Button.GREEN, Button.KEY_SPACE]
 
 class Blocks:
     FIELD_WIDTH = 10
+    KEY_REPEAT_DELAY = 0.1
+    KEY_REPEAT_INTERVAL = 0.1
 
     def __init__(self, game: Game):
         self._game = game
@@ -19,10 +21,11 @@ class Blocks:
         self._dropped = False
         self._score = 0
         self.line_sound = game.sound.get(SoundSample.EAT)
+        game.configure_key_repeat(self.KEY_REPEAT_DELAY, self.KEY_REPEAT_INTERVAL)
 
         screen.clear()
 
-        self._walls: List[Sprite] = []
+        self._walls = OccupancyGrid(screen)
         self._fallen: List[Sprite] = []
 
         self._first_column = int((self._game.screen.last_column - self.FIELD_WIDTH) / 3)
@@ -122,13 +125,13 @@ class Blocks:
         if not self._dropped:
             return
 
-        memory = self._game.screen.save()
+        screen = self._game.screen
         c1 = self._first_column + 1
-        c2 = self._first_column + self.FIELD_WIDTH + 1
+        c2 = self._first_column + self.FIELD_WIDTH
         sound_played = False
 
-        for row_num in range(self._game.screen.pixels.get_num_rows()):
-            row = memory[row_num][c1:c2]
+        for row_num in range(screen.pixels.get_num_rows()):
+            row = screen.get_region(c1, row_num, c2, row_num)[0]
 
             if all(cell[0] != Color.OFF for cell in row):
                 if not sound_played:
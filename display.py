@@ -0,0 +1,19 @@
+#!/usr/bin/python
+
+import signal
+from lib.calibration import *
+from lib.config import *
+from lib.pixels import *
+from lib.shared_pixels import *
+
+def sigterm_handler(_signo, _stack_frame):
+    owner.stop()
+
+calibration = CalibrationFactory(Config(CALIBRATION_FILE))
+owner = DisplayOwner(PixelsFactory("data/horizontal.csv", calibration = calibration))
+signal.signal(signal.SIGTERM, sigterm_handler)
+
+try:
+    owner.run()
+except KeyboardInterrupt:
+    pass
@@ -10,6 +10,9 @@ from lib.config import *
 from lib.game import *
 from lib.util import *
 
+SETTINGS = GameSettings("frogger.cfg", [Button.RED, Button.BLUE, Button.GREEN, Button.YELLOW],
+    "data/sprites.csv")
+
 class Frog:
     def __init__(self, game: Game):
         self._game = game
@@ -62,7 +65,7 @@ class Car:
     def move(self):
         return self.sprite.move(self.direction, outside= 3)
 
-def make_cars(cars: List):
+def make_cars(game: Game, cars: List):
     for i in range(2, game.screen.pixels.get_num_rows() - 2, 2):
         if i % 4 == 0:
             direction = MoveDirection.LEFT
@@ -75,16 +78,18 @@ def make_cars(cars: List):
 
 def make_walls(game: Game, walls):
     for i in range(-1, game.screen.pixels.get_num_rows() + 4, 6):
-        walls.append(game.sprites.get(SpriteID.WALL))
-        walls[-1].set_position(i, 0)
-        walls[-1].draw()
+        wall = game.sprites.get(SpriteID.WALL)
+        wall.set_position(i, 0)
+        wall.draw()
+        walls.append(wall)
+
+def start(game: Game):
+    global walls
 
-if __name__ == '__main__':
-    game = GameFactory("data/horizontal.csv", "data/font.csv", "frogger.cfg", [Button.RED, Button.BLUE, Button.GREEN, Button.YELLOW], "data/sprites.csv")
     frog = Frog(game)
     cars: List[Car] = []
-    walls = []
-    make_cars(cars)
+    walls = OccupancyGrid(game.screen)
+    make_cars(game, cars)
     make_walls(game, walls)
 
     car_sprites = []
@@ -133,8 +138,14 @@ if __name__ == '__main__':
 
         if num_frogs == required_num_frogs:
             game.show_win_lose(True)
-            sys.exit()
+            return
             
-        if not frog.sprite.get_collisions(car_sprites) == []:
+        if frog.sprite.any_collision(car_sprites):
             game.show_win_lose(False)
-            sys.exit()
\ No newline at end of file
+            return
+
+if __name__ == '__main__':
+    GameLauncher(
+        GameFactory("data/horizontal.csv", "data/font.csv", SETTINGS.config_file,
+            SETTINGS.sticky_buttons, SETTINGS.sprite_def),
+        start)
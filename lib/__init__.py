@@ -0,0 +1 @@
+import lib.startup
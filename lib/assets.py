@@ -0,0 +1,420 @@
+import csv
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from lib.colors import *
+from lib.startup import *
+
+BUNDLE_FILENAME = "assets.bin"
+MAGIC = b"LEDA"
+VERSION = 1
+
+KIND_SPRITES = 1
+KIND_FONT = 2
+KIND_MAPPING = 3
+
+_HEADER = struct.Struct("<4sBH")           # magic, version, entries
+_ENTRY = struct.Struct("<BHqQ20sII")       # kind, name length, source mtime, source size,
+                                           # source sha1, offset, length
+_COUNT = struct.Struct("<H")
+_FORM = struct.Struct("<BB")               # width, height
+_MASK = struct.Struct("<Q")
+_FONT = struct.Struct("<BBH")              # height, max width, glyphs
+_MAPPING = struct.Struct("<HH")            # columns, rows
+
+_COLOR_LETTERS = {letter: color for letter, color in Colors.colors}
+_COLORS = {color.value: color for color in Color}
+
+@dataclass
+class SpriteForm:
+    width: int
+    height: int
+    colors: List[List[Color]]
+    masks: List[int]                       # per row, bit n set when column n is opaque
+
+@dataclass
+class Font:
+    height: int
+    max_width: int
+    widths: List[int]
+    columns: List[List[int]]               # per glyph column, bit n set when row n is lit
+
+@dataclass
+class PixelMapping:
+    num_columns: int
+    num_rows: int
+    pixels: array
+
+def build_masks(colors: List[List[Color]]) -> List[int]:
+    masks = []
+    for row in colors:
+        mask = 0
+        for column, color in enumerate(row):
+            if color != Color.OFF:
+                mask |= 1 << column
+        masks.append(mask)
+    return masks
+
+def parse_sprites(filename: str) -> List[List[SpriteForm]]:
+    definition_file = open(filename)
+    definition_reader = csv.reader(definition_file)
+
+    animations = []
+    while True:
+        animation = []
+        animation_width = 0
+
+        for row in definition_reader:
+            row_width = 0
+            for column, element in enumerate(row):
+                if element != "":
+                    row_width = column + 1
+
+            if row_width == 0:
+                break
+
+            if row_width > animation_width:
+                animation_width = row_width
+
+            animation.append(row)
+
+        if animation_width == 0:
+            break
+
+        trimmed_animation = []
+        for row in animation:
+            trimmed_animation.append(row[:animation_width])
+
+        animations.append(_split_sprite_animation(trimmed_animation, animation_width))
+
+    definition_file.close()
+    return animations
+
+def _split_sprite_animation(animation: List[List[str]], width: int) -> List[SpriteForm]:
+    forms = []
+
+    while width > 0:
+        sprite_width = width
+        for column in range(width):
+            if all(row[column] == "" for row in animation):
+                sprite_width = column
+                break
+
+        sprite = []
+        for i, row in enumerate(animation):
+            sprite_row = row[:sprite_width]
+            animation[i] = row[sprite_width + 1:]
+            if any(cell != "" for cell in sprite_row):
+                sprite.append([_COLOR_LETTERS.get(cell, Color.OFF) for cell in sprite_row])
+
+        width = len(animation[0])
+        forms.append(SpriteForm(sprite_width, len(sprite), sprite, build_masks(sprite)))
+
+    return forms
+
+def parse_font(filename: str, height: int) -> Font:
+    definition_file = open(filename)
+    rows = []
+    i = 0
+    for row in csv.reader(definition_file):
+        if i == height:
+            i = 0
+            continue
+        rows.append(row)
+        i += 1
+    definition_file.close()
+
+    max_width = len(rows[0])
+    widths = []
+    columns = []
+    for first_row in range(0, len(rows) - height + 1, height):
+        glyph_rows = rows[first_row:first_row + height]
+        glyph_columns = []
+        for column in range(max_width):
+            mask = 0
+            for num_row, row in enumerate(glyph_rows):
+                if row[column] != "":
+                    mask |= 1 << num_row
+            if mask == 0:
+                break
+            glyph_columns.append(mask)
+        widths.append(len(glyph_columns))
+        columns.append(glyph_columns)
+
+    return Font(height, max_width, widths, columns)
+
+def parse_mapping(filename: str) -> PixelMapping:
+    definition_file = open(filename)
+    rows = list(csv.reader(definition_file))
+    definition_file.close()
+
+    pixels = array("H")
+    for row in rows:
+        pixels.extend(int(pixel_num) for pixel_num in row)
+    return PixelMapping(len(rows[0]), len(rows), pixels)
+
+def _encode_sprites(animations: List[List[SpriteForm]]) -> bytes:
+    data = bytearray(_COUNT.pack(len(animations)))
+    for forms in animations:
+        data += _COUNT.pack(len(forms))
+        for form in forms:
+            if form.width > _MASK.size * 8:
+                raise ValueError("Sprite form too wide for bundle: {}".format(form.width))
+            data += _FORM.pack(form.width, form.height)
+            data += bytes(color.value for row in form.colors for color in row)
+            for mask in form.masks:
+                data += _MASK.pack(mask)
+    return bytes(data)
+
+def _decode_sprites(data: memoryview) -> List[List[SpriteForm]]:
+    (num_animations,) = _COUNT.unpack_from(data, 0)
+    offset = _COUNT.size
+
+    animations = []
+    for _ in range(num_animations):
+        (num_forms,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+
+        forms = []
+        for _ in range(num_forms):
+            width, height = _FORM.unpack_from(data, offset)
+            offset += _FORM.size
+
+            values = data[offset:offset + width * height]
+            offset += width * height
+            colors = [[_COLORS[value] for value in values[row * width:(row + 1) * width]]
+                for row in range(height)]
+
+            masks = [mask for (mask,) in
+                _MASK.iter_unpack(data[offset:offset + height * _MASK.size])]
+            offset += height * _MASK.size
+
+            forms.append(SpriteForm(width, height, colors, masks))
+        animations.append(forms)
+
+    return animations
+
+def _encode_font(font: Font) -> bytes:
+    if font.height > 8:
+        raise ValueError("Font too tall for bundle: {}".format(font.height))
+
+    data = bytearray(_FONT.pack(font.height, font.max_width, len(font.widths)))
+    for width, columns in zip(font.widths, font.columns):
+        data.append(width)
+        data += bytes(columns)
+    return bytes(data)
+
+def _decode_font(data: memoryview) -> Font:
+    height, max_width, num_glyphs = _FONT.unpack_from(data, 0)
+    offset = _FONT.size
+
+    widths = []
+    columns = []
+    for _ in range(num_glyphs):
+        width = data[offset]
+        widths.append(width)
+        columns.append(list(data[offset + 1:offset + 1 + width]))
+        offset += 1 + width
+
+    return Font(height, max_width, widths, columns)
+
+def _encode_mapping(mapping: PixelMapping) -> bytes:
+    pixels = array("H", mapping.pixels)
+    if sys.byteorder != "little":
+        pixels.byteswap()
+    return _MAPPING.pack(mapping.num_columns, mapping.num_rows) + pixels.tobytes()
+
+def _decode_mapping(data: memoryview) -> PixelMapping:
+    num_columns, num_rows = _MAPPING.unpack_from(data, 0)
+    pixels = array("H")
+    pixels.frombytes(data[_MAPPING.size:_MAPPING.size + num_columns * num_rows * 2])
+    if sys.byteorder != "little":
+        pixels.byteswap()
+    return PixelMapping(num_columns, num_rows, pixels)
+
+def _source_key(filename: str) -> str:
+    return os.path.basename(filename)
+
+def _hash_file(filename: str) -> bytes:
+    file = open(filename, "rb")
+    digest = hashlib.sha1(file.read()).digest()
+    file.close()
+    return digest
+
+@dataclass
+class _BundleEntry:
+    kind: int
+    mtime: int
+    size: int
+    digest: bytes
+    offset: int
+    length: int
+
+class AssetBundle:
+    def __init__(self, filename: str):
+        self._file = open(filename, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, num_entries = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Not an asset bundle: {}".format(filename))
+
+        self._entries: Dict[str, _BundleEntry] = {}
+        offset = _HEADER.size
+        for _ in range(num_entries):
+            kind, name_length, mtime, size, digest, data_offset, length = (
+                _ENTRY.unpack_from(self._data, offset))
+            offset += _ENTRY.size
+            name = self._data[offset:offset + name_length].decode()
+            offset += name_length
+            self._entries[name] = _BundleEntry(kind, mtime, size, digest, data_offset, length)
+
+    def _get_data(self, source: str, kind: int) -> Optional[memoryview]:
+        entry = self._entries.get(_source_key(source))
+        if entry == None or entry.kind != kind:
+            return None
+
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            stat = None
+
+        if stat != None and (stat.st_mtime_ns != entry.mtime or stat.st_size != entry.size):
+            if stat.st_size != entry.size or _hash_file(source) != entry.digest:
+                return None
+
+        return memoryview(self._data)[entry.offset:entry.offset + entry.length]
+
+    def get_sprites(self, source: str) -> Optional[List[List[SpriteForm]]]:
+        data = self._get_data(source, KIND_SPRITES)
+        if data == None:
+            return None
+        try:
+            return _decode_sprites(data)
+        finally:
+            data.release()
+
+    def get_font(self, source: str) -> Optional[Font]:
+        data = self._get_data(source, KIND_FONT)
+        if data == None:
+            return None
+        try:
+            return _decode_font(data)
+        finally:
+            data.release()
+
+    def get_mapping(self, source: str) -> Optional[PixelMapping]:
+        data = self._get_data(source, KIND_MAPPING)
+        if data == None:
+            return None
+        try:
+            return _decode_mapping(data)
+        finally:
+            data.release()
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+_bundles: Dict[str, Optional[AssetBundle]] = {}
+
+def _get_bundle(source: str) -> Optional[AssetBundle]:
+    filename = os.path.join(os.path.dirname(source), BUNDLE_FILENAME)
+    if filename not in _bundles:
+        try:
+            _bundles[filename] = AssetBundle(filename)
+        except (OSError, ValueError, struct.error):
+            _bundles[filename] = None
+    return _bundles[filename]
+
+def load_sprites(filename: str) -> List[List[SpriteForm]]:
+    bundle = _get_bundle(filename)
+    if bundle != None:
+        with startup_trace("load", filename):
+            animations = bundle.get_sprites(filename)
+        if animations != None:
+            return animations
+
+    with startup_trace("parse", filename):
+        return parse_sprites(filename)
+
+def load_font(filename: str, height: int) -> Font:
+    bundle = _get_bundle(filename)
+    if bundle != None:
+        with startup_trace("load", filename):
+            font = bundle.get_font(filename)
+        if font != None and font.height == height:
+            return font
+
+    with startup_trace("parse", filename):
+        return parse_font(filename, height)
+
+def load_mapping(filename: str) -> PixelMapping:
+    bundle = _get_bundle(filename)
+    if bundle != None:
+        with startup_trace("load", filename):
+            mapping = bundle.get_mapping(filename)
+        if mapping != None:
+            return mapping
+
+    with startup_trace("parse", filename):
+        return parse_mapping(filename)
+
+def _get_kind(filename: str) -> int:
+    name = os.path.basename(filename)
+    if name.startswith("font"):
+        return KIND_FONT
+
+    definition_file = open(filename)
+    rows = list(csv.reader(definition_file))
+    definition_file.close()
+    if all(cell.isdigit() for row in rows for cell in row):
+        return KIND_MAPPING
+    return KIND_SPRITES
+
+def compile_assets(directory: str = "data", font_height: int = 5) -> str:
+    sections: List[Tuple[str, int, bytes]] = []
+    for source in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+        kind = _get_kind(source)
+        if kind == KIND_SPRITES:
+            data = _encode_sprites(parse_sprites(source))
+        elif kind == KIND_FONT:
+            data = _encode_font(parse_font(source, font_height))
+        else:
+            data = _encode_mapping(parse_mapping(source))
+        sections.append((source, kind, data))
+
+    directory_size = _HEADER.size + sum(_ENTRY.size + len(_source_key(source).encode())
+        for source, _, _ in sections)
+
+    header = bytearray(_HEADER.pack(MAGIC, VERSION, len(sections)))
+    offset = directory_size
+    for source, kind, data in sections:
+        name = _source_key(source).encode()
+        stat = os.stat(source)
+        header += _ENTRY.pack(kind, len(name), stat.st_mtime_ns, stat.st_size, _hash_file(source),
+            offset, len(data))
+        header += name
+        offset += len(data)
+
+    filename = os.path.join(directory, BUNDLE_FILENAME)
+    temp_filename = filename + ".tmp"
+    file = open(temp_filename, "wb")
+    file.write(header)
+    for _, _, data in sections:
+        file.write(data)
+    file.close()
+    os.replace(temp_filename, filename)
+
+    _bundles.pop(filename, None)
+    return filename
+
+if __name__ == "__main__":
+    print(compile_assets(sys.argv[1] if len(sys.argv) > 1 else "data"))
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from lib.config import *
+
+CALIBRATION_FILE = "calibration.cfg"
+TABLE_SIZE = 256
+
+@dataclass
+class ChannelCalibration:
+    factor: float = 1
+    gamma: float = 1
+
+    def build_table(self, max_brightness: int) -> List[int]:
+        table: List[int] = []
+        scale = TABLE_SIZE - 1
+        for value in range(TABLE_SIZE):
+            calibrated = round(scale * (value / scale) ** self.gamma * self.factor)
+            table.append(max(0, min(calibrated, max_brightness)))
+        return table
+
+class Calibration:
+    def __init__(self, red: Optional[ChannelCalibration] = None,
+        green: Optional[ChannelCalibration] = None, blue: Optional[ChannelCalibration] = None):
+
+        self.red = red if red != None else ChannelCalibration()
+        self.green = green if green != None else ChannelCalibration()
+        self.blue = blue if blue != None else ChannelCalibration()
+
+def CalibrationFactory(config: Config) -> Calibration:
+    channels: List[ChannelCalibration] = []
+    for channel in ["red", "green", "blue"]:
+        channels.append(ChannelCalibration(
+            config.get_float(channel + "_factor", 1),
+            config.get_float(channel + "_gamma", 1)))
+
+    return Calibration(*channels)
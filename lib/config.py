@@ -20,6 +20,12 @@ class Config:
             value = default
         return value
 
+    def get_float(self, key: str, default: float) -> float:
+        value = self.config.get(key)
+        if value == None:
+            value = default
+        return value
+
     def get_bool(self, key: str, default: bool) -> bool:
         value = self.config.get(key)
         if value == None:
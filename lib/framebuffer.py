@@ -0,0 +1,200 @@
+from array import array
+from typing import Dict, List, Optional, Tuple
+from lib.colors import *
+from lib.util import *
+
+_COLORS: List[Optional[Color]] = [None] * (max(color.value for color in Color) + 1)
+for _color in Color:
+    _COLORS[_color.value] = _color
+
+_COLOR_VALUES: Dict[Color, int] = {color: color.value for color in Color}
+
+class FrameSnapshot:
+    def __init__(self, colors: bytes, levels: array, brightnesses: List[Optional[float]]):
+        self.colors = colors
+        self.levels = levels
+        self.brightnesses = brightnesses
+
+class FrameBuffer:
+    MAX_LEVELS = 1024
+
+    def __init__(self, num_columns: int, num_rows: int):
+        self.num_columns = num_columns
+        self.num_rows = num_rows
+        self.size = num_columns * num_rows
+
+        self.colors = bytearray([Color.OFF.value]) * self.size
+        self.levels = array("H", [0]) * self.size
+
+        self._brightnesses: List[Optional[float]] = [None]
+        self._brightness_levels: Dict[Optional[float], int] = {None: 0}
+        self._max_levels = max_int(self.MAX_LEVELS, self.size * 2 + 2)
+        self.generation = 0
+
+    def get_level(self, brightness: Optional[float]) -> int:
+        level = self._brightness_levels.get(brightness)
+        if level == None:
+            self._reserve_levels(1)
+            level = len(self._brightnesses)
+            self._brightnesses.append(brightness)
+            self._brightness_levels[brightness] = level
+        return level
+
+    def _reserve_levels(self, count: int):
+        if len(self._brightnesses) + count > self._max_levels:
+            self._compact_levels()
+
+    def _compact_levels(self):
+        live_levels = sorted(set(self.levels) | {0})
+        remap = array("H", [0]) * len(self._brightnesses)
+        for new_level, level in enumerate(live_levels):
+            remap[level] = new_level
+
+        self.levels[:] = array("H", [remap[level] for level in self.levels])
+        self.set_brightnesses([self._brightnesses[level] for level in live_levels])
+
+    def get_brightness(self, level: int) -> Optional[float]:
+        return self._brightnesses[level]
+
+    def get_brightnesses(self) -> List[Optional[float]]:
+        return self._brightnesses
+
+    def set_brightnesses(self, brightnesses: List[Optional[float]]):
+        self._brightnesses = list(brightnesses)
+        self._brightness_levels = {}
+        for level, brightness in enumerate(self._brightnesses):
+            self._brightness_levels.setdefault(brightness, level)
+        self.generation += 1
+
+    def get_color(self, index: int) -> Color:
+        return _COLORS[self.colors[index]]
+
+    def get_pixel(self, column_num: int, row_num: int) -> Tuple[Color, Optional[float]]:
+        index = row_num * self.num_columns + column_num
+        return _COLORS[self.colors[index]], self._brightnesses[self.levels[index]]
+
+    def set_pixel(self, column_num: int, row_num: int, color: Color,
+        brightness: Optional[float] = None) -> bool:
+
+        index = row_num * self.num_columns + column_num
+        color_value = _COLOR_VALUES[color]
+        level = self.get_level(brightness)
+
+        if self.colors[index] == color_value and self.levels[index] == level:
+            return False
+
+        self.colors[index] = color_value
+        self.levels[index] = level
+        return True
+
+    def set_points(self, column_num: int, row_num: int, points: List[Tuple[int, int, int]],
+        brightness: Optional[float] = None, clip: bool = True) -> List[int]:
+
+        num_columns = self.num_columns
+        num_rows = self.num_rows
+        colors = self.colors
+        levels = self.levels
+        level = self.get_level(brightness)
+
+        changed: List[int] = []
+        for column_offset, row_offset, color_value in points:
+            column = column_num + column_offset
+            row = row_num + row_offset
+            if clip and not (0 <= column < num_columns and 0 <= row < num_rows):
+                continue
+
+            index = row * num_columns + column
+            if colors[index] != color_value or levels[index] != level:
+                colors[index] = color_value
+                levels[index] = level
+                changed.append(index)
+
+        return changed
+
+    def fill(self, color: Color, brightness: Optional[float] = None):
+        self.colors[:] = bytearray([_COLOR_VALUES[color]]) * self.size
+        self.levels[:] = array("H", [self.get_level(brightness)]) * self.size
+
+    def fill_rectangle(self, from_column: int, from_row: int, to_column: int, to_row: int,
+        color: Color, brightness: Optional[float] = None) -> List[int]:
+
+        from_column = max_int(from_column, 0)
+        from_row = max_int(from_row, 0)
+        to_column = min_int(to_column, self.num_columns - 1)
+        to_row = min_int(to_row, self.num_rows - 1)
+
+        changed: List[int] = []
+        width = to_column - from_column + 1
+        if width <= 0 or to_row < from_row:
+            return changed
+
+        color_value = _COLOR_VALUES[color]
+        level = self.get_level(brightness)
+        color_row = bytearray([color_value]) * width
+        level_row = array("H", [level]) * width
+
+        for row_num in range(from_row, to_row + 1):
+            start = row_num * self.num_columns + from_column
+            end = start + width
+
+            if self.colors[start:end] == color_row and self.levels[start:end] == level_row:
+                continue
+
+            for index in range(start, end):
+                if self.colors[index] != color_value or self.levels[index] != level:
+                    changed.append(index)
+
+            self.colors[start:end] = color_row
+            self.levels[start:end] = level_row
+
+        return changed
+
+    def get_region(self, from_column: int, from_row: int, to_column: int, to_row: int
+        ) -> List[List[Tuple[Color, Optional[float]]]]:
+
+        brightnesses = self._brightnesses
+        region = []
+        for row_num in range(from_row, to_row + 1):
+            start = row_num * self.num_columns + from_column
+            end = row_num * self.num_columns + to_column + 1
+            region.append([(_COLORS[color], brightnesses[level]) for color, level in
+                zip(self.colors[start:end], self.levels[start:end])])
+        return region
+
+    def copy(self) -> "FrameBuffer":
+        frame = FrameBuffer(self.num_columns, self.num_rows)
+        frame.copy_from(self)
+        return frame
+
+    def copy_from(self, frame: "FrameBuffer"):
+        self.colors[:] = frame.colors
+        self.levels[:] = frame.levels
+        self._brightnesses = list(frame._brightnesses)
+        self._brightness_levels = dict(frame._brightness_levels)
+        self.generation += 1
+
+    def save(self) -> FrameSnapshot:
+        return FrameSnapshot(bytes(self.colors), array("H", self.levels), self._brightnesses)
+
+    def restore(self, snapshot: FrameSnapshot) -> List[int]:
+        if snapshot.brightnesses is not self._brightnesses:
+            snapshot = self._rebase(snapshot)
+
+        colors = self.colors
+        levels = self.levels
+
+        changed: List[int] = []
+        if colors != snapshot.colors or levels != snapshot.levels:
+            changed = [index for index in range(self.size) if
+                colors[index] != snapshot.colors[index] or levels[index] != snapshot.levels[index]]
+
+        colors[:] = snapshot.colors
+        levels[:] = snapshot.levels
+        return changed
+
+    def _rebase(self, snapshot: FrameSnapshot) -> FrameSnapshot:
+        snapshot_levels = set(snapshot.levels)
+        self._reserve_levels(len(snapshot_levels))
+        remap = {level: self.get_level(snapshot.brightnesses[level]) for level in snapshot_levels}
+        return FrameSnapshot(snapshot.colors,
+            array("H", [remap[level] for level in snapshot.levels]), self._brightnesses)
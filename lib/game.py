@@ -1,6 +1,9 @@
+import os
 import signal
 import sys
-from typing import List, Callable, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Callable, Optional
 
 from lib.screen import *
 from lib.gamepad import *
@@ -13,6 +16,15 @@ CONTROL_VOLUME = Button.SELECT
 CONTROL_VOLUME_UP = Button.HAT_UP
 CONTROL_VOLUME_DOWN = Button.HAT_DOWN
 
+RECORD_ENV = "LEDPI_RECORD"
+
+@dataclass
+class GameSettings:
+    config_file: str
+    sticky_buttons: List[Button] = field(default_factory = list)
+    sprite_def: Optional[str] = None
+    brightness: Optional[float] = None
+
 class Game:
     def __init__(self, screen: Screen, text: Text, gamepad: Gamepad, sound: Sound, 
         config: Config, sprites: Optional[Sprites] = None):
@@ -26,11 +38,52 @@ class Game:
         self.game_over_sound = sound.get(SoundSample.GAME_OVER)
         self.click_sound = sound.get(SoundSample.CLICK)
 
+        self._sprites_cache: Dict[str, Sprites] = {}
         if sprites != None:
             self.sprites = sprites
 
+        self.configure_key_repeat()
+
+    def configure_key_repeat(self, delay: float = Gamepad.KEY_REPEAT_DELAY,
+        interval: float = Gamepad.KEY_REPEAT_INTERVAL):
+
+        delay = self.config.get_float("key_repeat_delay", delay)
+        interval = self.config.get_float("key_repeat_interval", interval)
+        self.gamepad.set_key_repeat(delay if delay > 0 else None, interval)
+
+    def configure(self, settings: GameSettings):
+        self.config = Config(settings.config_file)
+        self.sound.set_volume(self.config.get_int("volume", 100))
+        if self.config.get_bool("muted", False):
+            self.sound.mute()
+        else:
+            self.sound.unmute()
+
+        self.configure_key_repeat()
+
+        gamepad = self.gamepad
+        gamepad.set_sticky_buttons(settings.sticky_buttons)
+        gamepad.clear_sticky_button()
+        gamepad.clear_ignored_sticky_button()
+
+        brightness = settings.brightness
+        if brightness == None:
+            brightness = 1
+        self.screen.pixels.set_brightness(relative_brightness = brightness)
+
+        if settings.sprite_def != None:
+            sprites = self._sprites_cache.get(settings.sprite_def)
+            if sprites == None:
+                sprites = Sprites(settings.sprite_def, self.screen)
+                self._sprites_cache[settings.sprite_def] = sprites
+            self.sprites = sprites
+
+        self.screen.clear()
+
     def stop(self):
         self.screen.clear()
+        self.screen.stop_recording()
+        self.screen.pixels.close()
         self.gamepad.stop()
 
     def show_game_over(self, score: Optional[int] = None):
@@ -68,7 +121,7 @@ class Game:
         self.screen.clear()
         return button
 
-    def wait_any_button(self, delay = 0.5, timeout: float = 0) -> Button:
+    def wait_any_button(self, delay: float = 0, timeout: float = 0) -> Button:
         gamepad = self.gamepad
         while True:
             button = gamepad.wait_any_button(delay, timeout)
@@ -104,18 +157,112 @@ class Game:
             self.click_sound.play()
             self.config.set("volume", sound.get_volume())
 
+class GameLoop:
+    MAX_CATCH_UP_TICKS = 5
+
+    def __init__(self, tick: Callable[[], bool], render: Optional[Callable[[], None]] = None,
+        tick_rate: float = 20, render_rate: Optional[float] = None):
+
+        self._tick = tick
+        self._render = render
+        self.set_tick_rate(tick_rate)
+        self.set_render_rate(render_rate)
+
+        self.ticks = 0
+        self.renders = 0
+        self.skipped_ticks = 0
+        self.last_overshoot = 0.0
+        self.max_overshoot = 0.0
+        self._total_overshoot = 0.0
+        self._sleeps = 0
+
+    def set_tick_rate(self, tick_rate: float):
+        self._tick_interval = 1 / tick_rate
+
+    def set_render_rate(self, render_rate: Optional[float] = None):
+        self._render_interval = 0.0
+        if render_rate != None:
+            self._render_interval = 1 / render_rate
+
+    def get_average_overshoot(self) -> float:
+        if self._sleeps == 0:
+            return 0.0
+        return self._total_overshoot / self._sleeps
+
+    def run(self):
+        next_tick = time.perf_counter()
+        next_render = next_tick
+        pending_render = False
+
+        while True:
+            now = time.perf_counter()
+
+            ticks = 0
+            while now >= next_tick:
+                if ticks == self.MAX_CATCH_UP_TICKS:
+                    missed = int((now - next_tick) / self._tick_interval) + 1
+                    self.skipped_ticks += missed
+                    next_tick += missed * self._tick_interval
+                    break
+
+                if self._tick():
+                    return
+
+                self.ticks += 1
+                ticks += 1
+                pending_render = True
+                next_tick += self._tick_interval
+
+            now = time.perf_counter()
+            if pending_render and now >= next_render:
+                if self._render != None:
+                    self._render()
+                self.renders += 1
+                pending_render = False
+                next_render = max(next_render + self._render_interval, now)
+
+            wake_time = next_tick
+            if pending_render:
+                wake_time = min(next_tick, next_render)
+
+            self._sleep_until(wake_time)
+
+    def _sleep_until(self, wake_time: float):
+        delay = wake_time - time.perf_counter()
+        if delay <= 0:
+            return
+
+        time.sleep(delay)
+        overshoot = time.perf_counter() - wake_time
+
+        self.last_overshoot = overshoot
+        self.max_overshoot = max(self.max_overshoot, overshoot)
+        self._total_overshoot += overshoot
+        self._sleeps += 1
+
 _game: Game
 
 def sigterm_handler(_signo, _stack_frame):
     print("Killed")
     _game.screen.clear()
+    _game.screen.pixels.close()
     sys.exit(0)
 
 def GameFactory(screen_def: str, font_def: str, config_file: str, 
     sticky_buttons: List[Button] = [], sprite_def: Optional[str] = None,
-    brightness: Optional[float] = None) -> Game:
+    brightness: Optional[float] = None, pixels: Optional[str] = None,
+    threaded_output: bool = False, calibration_file: str = CALIBRATION_FILE) -> Game:
     
-    screen = Screen(PixelsFactory(screen_def, brightness))
+    calibration = CalibrationFactory(Config(calibration_file))
+    output = PixelsFactory(screen_def, brightness, pixels, calibration)
+    if threaded_output:
+        from lib.threaded_pixels import ThreadedPixels
+        output = ThreadedPixels(output)
+
+    screen = Screen(output)
+    record_file = os.environ.get(RECORD_ENV)
+    if record_file != None:
+        screen.start_recording(record_file)
     text = Text(font_def, screen)
     gamepad = Gamepad(0, sticky_buttons)
     config = Config(config_file)
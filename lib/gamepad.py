@@ -1,9 +1,13 @@
+from collections import deque
 from dataclasses import dataclass
 import threading
 import time
-import inputs
 from enum import Enum, auto
-from typing import List, Callable, Optional
+from typing import TYPE_CHECKING, Deque, Dict, List, Callable, Optional
+from lib.startup import *
+
+if TYPE_CHECKING:
+    import inputs
 
 class Button(Enum):
     NONE = auto()
@@ -54,9 +58,18 @@ class ButtonInfo:
     condition: Callable[[int], bool]
     pressed: bool
 
+@dataclass
+class ButtonEvent:
+    button: Button
+    pressed: bool
+    time: float
+    sequence: int
+    repeat: bool = False
+
 class Gamepad:
-    _TRACKING_CHECK_DELAY = 1 / 100     # times per second
-    PRE_CHECK_DELAY = 0.5               # wait for previous button to be depressed
+    EVENT_QUEUE_SIZE = 64
+    KEY_REPEAT_DELAY = 0.5
+    KEY_REPEAT_INTERVAL = 0.5
 
     def __init__(self, num: int, _sticky_buttons: List[Button] = []):
         self.init_button_table()
@@ -65,16 +78,28 @@ class Gamepad:
         self._sticky_buttons = _sticky_buttons
         self._ignored_sticky_buttons = []
         self._tracking_lock = threading.Lock()
+        self._events: Deque[ButtonEvent] = deque(maxlen = self.EVENT_QUEUE_SIZE)
+        self._presses: Deque[ButtonEvent] = deque(maxlen = self.EVENT_QUEUE_SIZE)
+        self._events_changed = threading.Condition()
+        self._sequence = 0
 
-        gamepads: List[inputs.GamePad] = inputs.DeviceManager().gamepads
-        self._gamepad: Optional[inputs.GamePad] = None
+        self._repeat_delay: Optional[float] = None
+        self._repeat_interval = self.KEY_REPEAT_INTERVAL
+        self._next_repeat: Dict[Button, float] = {}
+
+        with startup_trace("open", "input devices"):
+            import inputs
+            devices = inputs.DeviceManager()
+
+        gamepads: List["inputs.GamePad"] = devices.gamepads
+        self._gamepad: Optional["inputs.GamePad"] = None
         if len(gamepads) > num:
             self._gamepad = gamepads[num]
             thread = threading.Thread(target = self.gamepad_tracker, daemon = True)
             thread.start()
 
-        keyboards: List[inputs.Keyboard] = inputs.DeviceManager().keyboards
-        self._keyboard: Optional[inputs.Keyboard] = None
+        keyboards: List["inputs.Keyboard"] = devices.keyboards
+        self._keyboard: Optional["inputs.Keyboard"] = None
         if len(keyboards) > 0:
             self._keyboard = keyboards[0]
             thread = threading.Thread(target = self.keyboard_tracker, daemon = True)
@@ -136,6 +161,24 @@ class Gamepad:
             ButtonInfo(Button.KEY_SPACE,     "KEY_SPACE",     push_button, False)
        ]
 
+        self._codes: Dict[str, List[ButtonInfo]] = {}
+        for button in self._buttons:
+            self._codes.setdefault(button.code, []).append(button)
+
+    def set_key_repeat(self, delay: Optional[float], interval: float = KEY_REPEAT_INTERVAL):
+        with self._events_changed:
+            self._repeat_delay = delay
+            self._repeat_interval = interval
+            self._next_repeat = {}
+            if delay != None:
+                now = time.monotonic()
+                for button in self._buttons:
+                    if button.pressed:
+                        self._next_repeat[button.id] = now + delay
+
+    def set_sticky_buttons(self, buttons: List[Button]):
+        self._sticky_buttons = buttons
+
     def set_sticky_button(self, button: Button):
         self._sticky_button = button
 
@@ -178,23 +221,93 @@ class Gamepad:
         except Exception:
             pass
 
-    def process_event(self, event: inputs.InputEvent):
+    def process_event(self, event: "inputs.InputEvent"):
+        buttons = self._codes.get(event.code)
+        if buttons == None:
+            return
+
+        changed: List[ButtonInfo] = []
         self._tracking_lock.acquire()
 
-        for button in self._buttons:
-            if event.code == button.code:
-                button.pressed = button.condition(event.state)
-                
-                if (button.pressed and (button.id in self._sticky_buttons) and
-                    (button.id not in self._ignored_sticky_buttons)):
+        for button in buttons:
+            pressed = button.condition(event.state)
+            if pressed != button.pressed:
+                button.pressed = pressed
+                changed.append(button)
+
+            if (pressed and (button.id in self._sticky_buttons) and
+                (button.id not in self._ignored_sticky_buttons)):
 
-                    self._sticky_button = button.id
+                self._sticky_button = button.id
 
         self._tracking_lock.release()
 
-    def get_one(self) -> Button:
+        if len(changed) > 0:
+            self._publish(changed)
+
+    def _publish(self, buttons: List[ButtonInfo]):
+        now = time.monotonic()
+        with self._events_changed:
+            for button in buttons:
+                self._sequence += 1
+                event = ButtonEvent(button.id, button.pressed, now, self._sequence)
+                self._events.append(event)
+
+                if button.pressed:
+                    self._presses.append(event)
+                    if self._repeat_delay != None:
+                        self._next_repeat[button.id] = now + self._repeat_delay
+                else:
+                    self._next_repeat.pop(button.id, None)
+
+            self._events_changed.notify_all()
+
+    def _emit_repeats(self, now: float) -> Optional[float]:
+        next_repeat: Optional[float] = None
+        for button_id, due in list(self._next_repeat.items()):
+            if now - due > self._repeat_interval:
+                due = now + self._repeat_interval
+                self._next_repeat[button_id] = due
+            elif due <= now:
+                self._sequence += 1
+                event = ButtonEvent(button_id, True, now, self._sequence, repeat = True)
+                self._events.append(event)
+                self._presses.append(event)
+
+                if (button_id in self._sticky_buttons and
+                    button_id not in self._ignored_sticky_buttons):
+
+                    self._sticky_button = button_id
+
+                due = max(due + self._repeat_interval, now)
+                self._next_repeat[button_id] = due
+
+            if next_repeat == None or due < next_repeat:
+                next_repeat = due
+
+        return next_repeat
+
+    def get_sequence(self) -> int:
+        with self._events_changed:
+            return self._sequence
+
+    def get_event(self, timeout: Optional[float] = None) -> Optional[ButtonEvent]:
+        with self._events_changed:
+            if len(self._events) == 0:
+                self._events_changed.wait(timeout)
+            if len(self._events) == 0:
+                return None
+            return self._events.popleft()
+
+    def get_events(self) -> List[ButtonEvent]:
+        with self._events_changed:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def get_one(self, buttons: Optional[List[Button]] = None) -> Button:
         for button in self._buttons:
-            if button.pressed:
+            if button.pressed and (buttons == None or button.id in buttons):
                 return button.id
         return Button.NONE
 
@@ -205,19 +318,66 @@ class Gamepad:
                 buttons.append(button.id)
         return buttons
 
-    def wait_any_button(self, delay = PRE_CHECK_DELAY, timeout: float = 0) -> Button:
-        start_time = time.time()
+    def wait_any_button(self, delay: float = 0, timeout: float = 0) -> Button:
+        after_sequence = self.get_sequence()
+        deadline = time.monotonic() + timeout if timeout > 0 else None
 
         if delay > 0:
             time.sleep(delay)
 
-        while True:
-            button = self.get_one()
-            if button != Button.NONE:
-                return button
+        event = self._wait_press(after_sequence, None, deadline)
+        if event == None:
+            return Button.NONE
+        return event.button
+
+    def wait_press(self, after_sequence: int, buttons: Optional[List[Button]] = None,
+        timeout: float = 0) -> Optional[ButtonEvent]:
+
+        deadline = time.monotonic() + timeout if timeout > 0 else None
+        return self._wait_press(after_sequence, buttons, deadline)
+
+    def _wait_press(self, after_sequence: int, buttons: Optional[List[Button]],
+        deadline: Optional[float]) -> Optional[ButtonEvent]:
+
+        with self._events_changed:
+            while True:
+                now = time.monotonic()
+                next_repeat = self._emit_repeats(now)
 
-            time.sleep(self._TRACKING_CHECK_DELAY)
+                for event in self._presses:
+                    if event.sequence > after_sequence and (buttons == None or
+                        event.button in buttons):
 
-            passed_time = time.time() - start_time
-            if (timeout > 0 and passed_time > timeout):
-                return Button.NONE
+                        return event
+
+                wake_time = deadline
+                if next_repeat != None and (wake_time == None or next_repeat < wake_time):
+                    wake_time = next_repeat
+
+                if wake_time == None:
+                    self._events_changed.wait()
+                    continue
+
+                if deadline != None and now >= deadline:
+                    return None
+                self._events_changed.wait(max(wake_time - now, 0))
+
+    def wait_for(self, buttons: List[Button], timeout: float = 0) -> Button:
+        deadline = time.monotonic() + timeout if timeout > 0 else None
+        return self._wait(buttons, deadline)
+
+    def _wait(self, buttons: Optional[List[Button]], deadline: Optional[float]) -> Button:
+        with self._events_changed:
+            while True:
+                button = self.get_one(buttons)
+                if button != Button.NONE:
+                    return button
+
+                if deadline == None:
+                    self._events_changed.wait()
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return Button.NONE
+                self._events_changed.wait(remaining)
@@ -6,32 +6,37 @@
 #   cat $CPUFREQ/cpuinfo_max_freq > $CPUFREQ/scaling_min_freq
 # - reboot
 
-import csv
+import operator
 import board
-from typing import Optional
+from array import array
+from typing import Iterable, Optional
 from neopixel import NeoPixel
+from lib.assets import *
 from lib.colors import *
 from lib.pixels import *
+from lib.startup import *
 
 class LEDPixels(Pixels):
     _BASE_BRIGHTNESS = 92
     _MAX_BRIGHTNESS = 255
+    _BLIT_MIN_PIXELS = 32
 
     def __init__(self, definition_filename: str, relative_brightness: Optional[float] = None):
         super().__init__(self._BASE_BRIGHTNESS, self._MAX_BRIGHTNESS, relative_brightness)
 
-        definition_file = open(definition_filename)
-        definition_reader = csv.reader(definition_file)
-
-        self._pixels = []
-        for row in definition_reader:
-            self._pixels.append(row)
-
-        self._num_columns = len(self._pixels[0])
-        self._num_rows = len(self._pixels)
+        mapping = load_mapping(definition_filename)
+        self._num_columns = mapping.num_columns
+        self._num_rows = mapping.num_rows
+        self._pixels = mapping.pixels
 
         num_pixels = self._num_columns * self._num_rows
-        self._strip = NeoPixel(board.D10, num_pixels, auto_write = False)
+        strip_order = [0] * num_pixels
+        for frame_index, pixel_num in enumerate(self._pixels):
+            strip_order[pixel_num] = frame_index
+        self._gather = operator.itemgetter(*strip_order)
+
+        with startup_trace("open", "neopixel"):
+            self._strip = NeoPixel(board.D10, num_pixels, auto_write = False)
 
     def get_num_columns(self) -> int:
         return self._num_columns
@@ -48,6 +53,17 @@ class LEDPixels(Pixels):
     def set_pixel(self, column_num: int, row_num: int, color: Color,
         relative_brightness: Optional[float] = None):
 
-        pixel_num = int(self._pixels[row_num][column_num])
-        self._strip[pixel_num] = self._get_leds_brightness(color, relative_brightness)
+        pixel_num = self._pixels[row_num * self._num_columns + column_num]
+        self._strip[pixel_num] = self._palette.get(color, relative_brightness)
         return
+
+    def blit(self, frame: FrameBuffer, indices: Optional[Iterable[int]] = None):
+        if indices != None:
+            indices = list(indices)
+            if len(indices) < self._BLIT_MIN_PIXELS:
+                super().blit(frame, indices)
+                return
+
+        tables = self._get_value_tables(frame)
+        colors = [tables[level][color] for color, level in zip(frame.colors, frame.levels)]
+        self._strip[:] = self._gather(colors)
@@ -0,0 +1,103 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Iterable, List, Optional, Tuple
+from lib.assets import *
+from lib.colors import *
+from lib.pixels import *
+from lib.wire_timing import *
+
+@dataclass
+class FrameStats:
+    frame: int
+    time: float
+    duration: float
+    pixel_writes: int
+    region: Optional[Tuple[int, int, int, int]]
+    transfer_time: float
+
+@dataclass
+class PixelsStats:
+    frames: int = 0
+    idle_frames: int = 0
+    pixel_writes: int = 0
+    fills: int = 0
+    blits: int = 0
+    total_time: float = 0
+    frame_log: Deque[FrameStats] = field(default_factory = lambda: deque(maxlen = 1000))
+
+class MemoryPixels(Pixels):
+    COLUMNS = 24
+    ROWS = 18
+    _BASE_BRIGHTNESS = 92
+    _MAX_BRIGHTNESS = 255
+
+    def __init__(self, definition_filename: Optional[str] = None,
+        relative_brightness: Optional[float] = None, timing: Optional[WireTiming] = None):
+
+        super().__init__(self._BASE_BRIGHTNESS, self._MAX_BRIGHTNESS, relative_brightness)
+
+        self._num_columns = self.COLUMNS
+        self._num_rows = self.ROWS
+        if definition_filename != None:
+            mapping = load_mapping(definition_filename)
+            self._num_columns = mapping.num_columns
+            self._num_rows = mapping.num_rows
+
+        self.frame: List[Tuple[int, int, int]] = [(0, 0, 0)] * (self._num_columns * self._num_rows)
+        self.timing = timing if timing != None else WireTiming(enabled = False)
+        self.stats = PixelsStats()
+        self._frame_writes = 0
+        self._last_update = time.perf_counter()
+
+    def get_num_columns(self) -> int:
+        return self._num_columns
+
+    def get_num_rows(self) -> int:
+        return self._num_rows
+
+    def get_pixel(self, column_num: int, row_num: int) -> Tuple[int, int, int]:
+        return self.frame[row_num * self._num_columns + column_num]
+
+    def update(self):
+        self._record_frame(None)
+
+    def update_region(self, from_column: int, from_row: int, to_column: int, to_row: int):
+        self._record_frame((from_column, from_row, to_column, to_row))
+
+    def idle(self):
+        self.stats.idle_frames += 1
+
+    def fill(self, color: Color, brightness: Optional[float] = None):
+        self.frame = [self._palette.get(color, brightness)] * len(self.frame)
+        self.stats.fills += 1
+        self._frame_writes += len(self.frame)
+
+    def set_pixel(self, column_num: int, row_num: int, color: Color,
+        brightness: Optional[float] = None):
+
+        self.frame[row_num * self._num_columns + column_num] = self._palette.get(color, brightness)
+        self._frame_writes += 1
+
+    def blit(self, frame: FrameBuffer, indices: Optional[Iterable[int]] = None):
+        self.stats.blits += 1
+        super().blit(frame, indices)
+
+    def _record_frame(self, region: Optional[Tuple[int, int, int, int]]):
+        transfer_time = self.timing.transfer(len(self.frame))
+        now = time.perf_counter()
+        duration = now - self._last_update
+        self._last_update = now
+
+        stats = self.stats
+        stats.frames += 1
+        stats.pixel_writes += self._frame_writes
+        stats.total_time += duration
+        stats.frame_log.append(FrameStats(stats.frames, now, duration, self._frame_writes, region,
+            transfer_time))
+        self._frame_writes = 0
+
+    def reset_stats(self):
+        self.stats = PixelsStats()
+        self._frame_writes = 0
+        self._last_update = time.perf_counter()
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from lib.colors import *
+
+RGB = Tuple[int, int, int]
+PaletteTable = Dict[Color, RGB]
+
+class Palette:
+    MAX_LEVELS = 32
+    _PRESET_LEVELS = [-1, 1]
+
+    def __init__(self, calculate: Callable[[Color, Optional[float]], RGB],
+        max_levels: int = MAX_LEVELS):
+
+        self._calculate = calculate
+        self._max_levels = max_levels
+        self._presets: Dict[float, PaletteTable] = {}
+        self._levels: "OrderedDict[float, PaletteTable]" = OrderedDict()
+        self.rebuild()
+
+    def rebuild(self):
+        self._levels.clear()
+        self._default = self._build(None)
+        self._presets = {level: self._build(level) for level in self._PRESET_LEVELS}
+
+    def get(self, color: Color, brightness: Optional[float] = None) -> RGB:
+        if brightness == None:
+            return self._default[color]
+        return self.get_table(brightness)[color]
+
+    def get_table(self, brightness: Optional[float] = None) -> PaletteTable:
+        if brightness == None:
+            return self._default
+
+        table = self._presets.get(brightness)
+        if table != None:
+            return table
+
+        table = self._levels.get(brightness)
+        if table != None:
+            self._levels.move_to_end(brightness)
+            return table
+
+        table = self._build(brightness)
+        if len(self._levels) >= self._max_levels:
+            self._levels.popitem(last = False)
+        self._levels[brightness] = table
+        return table
+
+    def get_value_table(self, brightness: Optional[float] = None) -> List[RGB]:
+        table = self.get_table(brightness)
+        values: List[RGB] = [(0, 0, 0)] * (max(color.value for color in table) + 1)
+        for color, rgb in table.items():
+            values[color.value] = rgb
+        return values
+
+    def _build(self, brightness: Optional[float]) -> PaletteTable:
+        table: PaletteTable = {}
+        for color in Color:
+            table[color] = self._calculate(color, brightness)
+        return table
@@ -1,9 +1,10 @@
-import time
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from lib.colors import *
 from lib.pixels import *
+from lib.startup import *
+from lib.wire_timing import *
 import pyglet
-from pyglet import shapes
+from pyglet import gl, shapes
 
 class Shape(Enum):
     CIRCLE = auto()
@@ -19,16 +20,18 @@ class PCPixels(Pixels):
     _BASE_BRIGHTNESS = _MAX_BRIGHTNESS
 
     def __init__(self, relative_brightness: Optional[float] = None,
-        shape: Shape = DEFAULT_SHAPE):
+        shape: Shape = DEFAULT_SHAPE, timing: Optional[WireTiming] = None):
         
         super().__init__(self._BASE_BRIGHTNESS, self._MAX_BRIGHTNESS, relative_brightness)
 
+        self.timing = timing if timing != None else WireTimingFactory()
         self._shape = shape
         self._interval = self.SHAPE_WIDTH * 2
         self._width_pixels = self.COLUMNS * self._interval + self.BORDER * 2
         self._height_pixels = self.ROWS * self._interval + self.BORDER * 2
 
-        self._window = pyglet.window.Window(self._width_pixels, self._height_pixels)
+        with startup_trace("open", "window"):
+            self._window = pyglet.window.Window(self._width_pixels, self._height_pixels)
         self._batch = pyglet.graphics.Batch()
 
         self._shapes: List[List[shapes._ShapeBase]] = []
@@ -49,17 +52,17 @@ class PCPixels(Pixels):
         return self.ROWS
 
     def update(self):
-        pulse_time = 1.25 / 1000000
-        bits_per_pixel = 24
-        pixels = self.COLUMNS * self.ROWS
-        time.sleep(pixels * bits_per_pixel * pulse_time)
+        self.timing.transfer(self.COLUMNS * self.ROWS)
 
+        self.idle()
+        self._batch.draw()
+        self._window.flip()
+
+    def idle(self):
         pyglet.clock.tick(True)
         pyglet.app.platform_event_loop.dispatch_posted_events()
         self._window.switch_to()
         self._window.dispatch_events()
-        self._batch.draw()
-        self._window.flip()
 
     def fill(self, color: Color, brightness: Optional[float] = None):
         for column in range(self.COLUMNS):
@@ -77,3 +80,106 @@ class PCPixels(Pixels):
             return shapes.Rectangle(x, y, self.SHAPE_WIDTH, self.SHAPE_WIDTH, batch = self._batch)
 
         return shapes.Circle(x, y, self.SHAPE_WIDTH / 2, batch = self._batch)
+
+class PCTexturePixels(Pixels):
+    COLUMNS = PCPixels.COLUMNS
+    ROWS = PCPixels.ROWS
+    SCALE = PCPixels.SHAPE_WIDTH * 2
+    BORDER = PCPixels.BORDER
+    _BYTES_PER_PIXEL = 3
+    _MAX_BRIGHTNESS = 255
+    _BASE_BRIGHTNESS = _MAX_BRIGHTNESS
+
+    def __init__(self, relative_brightness: Optional[float] = None,
+        columns: int = COLUMNS, rows: int = ROWS, scale: int = SCALE, dot_mask: bool = True,
+        timing: Optional[WireTiming] = None):
+
+        super().__init__(self._BASE_BRIGHTNESS, self._MAX_BRIGHTNESS, relative_brightness)
+
+        self.timing = timing if timing != None else WireTimingFactory()
+
+        self._num_columns = columns
+        self._num_rows = rows
+        self._scale = scale
+        self._pitch = columns * self._BYTES_PER_PIXEL
+        self._buffer = bytearray(columns * rows * self._BYTES_PER_PIXEL)
+
+        with startup_trace("open", "window"):
+            self._window = pyglet.window.Window(columns * scale + self.BORDER * 2,
+                rows * scale + self.BORDER * 2)
+
+        self._image = pyglet.image.ImageData(columns, rows, "RGB", bytes(self._buffer),
+            -self._pitch)
+        self._texture = pyglet.image.Texture.create(columns, rows)
+        self._set_nearest_filter(self._texture)
+
+        self._mask: Optional[pyglet.image.TileableTexture] = None
+        if dot_mask:
+            self._mask = self._create_dot_mask(scale)
+
+    def get_num_columns(self) -> int:
+        return self._num_columns
+
+    def get_num_rows(self) -> int:
+        return self._num_rows
+
+    def update(self):
+        self.timing.transfer(self._num_columns * self._num_rows)
+
+        self.idle()
+        self._image.set_data("RGB", -self._pitch, bytes(self._buffer))
+        self._texture.blit_into(self._image, 0, 0, 0)
+
+        width = self._num_columns * self._scale
+        height = self._num_rows * self._scale
+        self._window.clear()
+        self._texture.blit(self.BORDER, self.BORDER, width = width, height = height)
+        if self._mask != None:
+            gl.glEnable(gl.GL_BLEND)
+            gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+            self._mask.blit_tiled(self.BORDER, self.BORDER, 0, width, height)
+        self._window.flip()
+
+    def idle(self):
+        pyglet.clock.tick(True)
+        pyglet.app.platform_event_loop.dispatch_posted_events()
+        self._window.switch_to()
+        self._window.dispatch_events()
+
+    def fill(self, color: Color, brightness: Optional[float] = None):
+        self._buffer[:] = bytes(self._palette.get(color, brightness)) * (
+            self._num_columns * self._num_rows)
+
+    def set_pixel(self, column_num: int, row_num: int, color: Color,
+        brightness: Optional[float] = None):
+
+        offset = (row_num * self._num_columns + column_num) * self._BYTES_PER_PIXEL
+        self._buffer[offset:offset + self._BYTES_PER_PIXEL] = bytes(
+            self._palette.get(color, brightness))
+
+    def blit(self, frame: FrameBuffer, indices: Optional[Iterable[int]] = None):
+        if indices != None:
+            super().blit(frame, indices)
+            return
+
+        tables = self._get_value_tables(frame)
+        self._buffer[:] = bytes(channel for color, level in zip(frame.colors, frame.levels)
+            for channel in tables[level][color])
+
+    def _set_nearest_filter(self, texture: pyglet.image.Texture):
+        gl.glBindTexture(texture.target, texture.id)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+
+    def _create_dot_mask(self, scale: int) -> pyglet.image.TileableTexture:
+        radius = scale / 4
+        center = (scale - 1) / 2
+
+        data = bytearray()
+        for y in range(scale):
+            for x in range(scale):
+                inside = (x - center) ** 2 + (y - center) ** 2 <= radius ** 2
+                data.extend([0, 0, 0, 0 if inside else 255])
+
+        image = pyglet.image.ImageData(scale, scale, "RGBA", bytes(data))
+        return pyglet.image.TileableTexture.create_for_image(image)
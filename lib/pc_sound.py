@@ -14,7 +14,7 @@ class PCSoundSample(SoundSample):
             player.play()
 
 class PCSound(Sound):
-    def get(self, filename: str) -> PCSoundSample:
+    def _load(self, filename: str) -> PCSoundSample:
         sample: pyglet.media.Player
         sample = pyglet.media.load(AUDIO_DIR + "/" + filename + ".wav",
             streaming = False)
@@ -17,6 +17,6 @@ class PiSound(Sound):
         command = ["amixer", "sset", "Master", "{}%".format(self._volume)]
         subprocess.run(command, stdout = subprocess.DEVNULL)
 
-    def get(self, filename: str) -> PiSoundSample:
+    def _load(self, filename: str) -> PiSoundSample:
         sample = WaveObject.from_wave_file(AUDIO_DIR + "/" + filename + ".wav")
         return PiSoundSample(self, sample)
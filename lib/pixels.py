@@ -1,8 +1,12 @@
 from abc import abstractmethod, ABC
 import math
+import os
 import sys
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from lib.calibration import *
 from lib.colors import *
+from lib.framebuffer import *
+from lib.palette import *
 from lib.util import *
 
 class Pixels(ABC):
@@ -16,6 +20,10 @@ class Pixels(ABC):
         if relative_brightness != None:
             self._relative_brightness = relative_brightness
 
+        self._calibration = Calibration()
+        self._bake_calibration()
+        self._palette = Palette(self._calculate_leds_brightness)
+
     @abstractmethod
     def get_num_columns(self) -> int:
         raise NotImplementedError
@@ -28,6 +36,15 @@ class Pixels(ABC):
     def update(self):
         raise NotImplementedError
 
+    def update_region(self, from_column: int, from_row: int, to_column: int, to_row: int):
+        self.update()
+
+    def idle(self):
+        pass
+
+    def close(self):
+        pass
+
     @abstractmethod
     def fill(self, color: Color, brightness: Optional[float] = None):
         raise NotImplementedError
@@ -36,8 +53,63 @@ class Pixels(ABC):
     def set_pixel(self, column_num: int, row_num: int, color: Color, brightness: Optional[float] = None):
         raise NotImplementedError
     
+    def blit(self, frame: FrameBuffer, indices: Optional[Iterable[int]] = None):
+        if indices == None:
+            indices = range(frame.size)
+
+        num_columns = frame.num_columns
+        for index in indices:
+            self.set_pixel(index % num_columns, index // num_columns,
+                frame.get_color(index), frame.get_brightness(frame.levels[index]))
+
+    def _get_value_tables(self, frame: FrameBuffer) -> Dict[int, List[Tuple[int, int, int]]]:
+        brightnesses = frame.get_brightnesses()
+        return {level: self._palette.get_value_table(brightnesses[level])
+            for level in set(frame.levels)}
+
+    def get_relative_brightness(self) -> float:
+        return self._relative_brightness
+
+    def set_brightness(self, base_brightness: Optional[int] = None,
+        max_brightness: Optional[int] = None, relative_brightness: Optional[float] = None):
+
+        if base_brightness == None:
+            base_brightness = self._base_brightness
+        if max_brightness == None:
+            max_brightness = self._max_brightness
+        if relative_brightness == None:
+            relative_brightness = self._relative_brightness
+
+        if (base_brightness == self._base_brightness and
+            max_brightness == self._max_brightness and
+            relative_brightness == self._relative_brightness):
+
+            return
+
+        self._base_brightness = base_brightness
+        self._relative_brightness = relative_brightness
+        if max_brightness != self._max_brightness:
+            self._max_brightness = max_brightness
+            self._bake_calibration()
+        self._palette.rebuild()
+
+    def set_calibration(self, calibration: Calibration):
+        self._calibration = calibration
+        self._bake_calibration()
+        self._palette.rebuild()
+
+    def _bake_calibration(self):
+        self._red_table = self._calibration.red.build_table(self._max_brightness)
+        self._green_table = self._calibration.green.build_table(self._max_brightness)
+        self._blue_table = self._calibration.blue.build_table(self._max_brightness)
+
     def _get_leds_brightness(self, color: Color, relative_brightness: Optional[float] = None
         ) -> Tuple[int, int, int]:
+
+        return self._palette.get(color, relative_brightness)
+
+    def _calculate_leds_brightness(self, color: Color, relative_brightness: Optional[float] = None
+        ) -> Tuple[int, int, int]:
         
         if relative_brightness == None:
             relative_brightness = self._relative_brightness
@@ -89,9 +161,9 @@ class Pixels(ABC):
             green = int(self.green(brightness))
             blue = math.floor(self.blue(brightness) / 2)
 
-        red = min_int(red, self._max_brightness)
-        green = min_int(green, self._max_brightness)
-        blue = min_int(blue, self._max_brightness)
+        red = self._red_table[min_int(red, self._max_brightness)]
+        green = self._green_table[min_int(green, self._max_brightness)]
+        blue = self._blue_table[min_int(blue, self._max_brightness)]
 
         return red, green, blue
 
@@ -104,10 +176,44 @@ class Pixels(ABC):
     def blue(self, brightness: float):
         return brightness * 1         # 1.5
 
-def PixelsFactory(screen_def: str, brightness: Optional[float] = None) -> Pixels:
-    if sys.platform == "win32":
+PIXELS_ENV = "LEDPI_PIXELS"
+PIXELS_MEMORY = "memory"
+PIXELS_PC = "pc"
+PIXELS_PC_TEXTURE = "pc_texture"
+PIXELS_LED = "led"
+PIXELS_SHARED = "shared"
+
+def PixelsFactory(screen_def: str, brightness: Optional[float] = None,
+    backend: Optional[str] = None, calibration: Optional[Calibration] = None) -> Pixels:
+
+    pixels = _create_pixels(screen_def, brightness, backend)
+    if calibration != None:
+        pixels.set_calibration(calibration)
+    return pixels
+
+def _create_pixels(screen_def: str, brightness: Optional[float] = None,
+    backend: Optional[str] = None) -> Pixels:
+
+    if backend == None:
+        backend = os.environ.get(PIXELS_ENV)
+    if backend == None:
+        backend = PIXELS_PC if sys.platform == "win32" else PIXELS_LED
+
+    if backend == PIXELS_MEMORY:
+        from lib.memory_pixels import MemoryPixels
+        return(MemoryPixels(screen_def, brightness))
+    elif backend == PIXELS_PC:
         from lib.pc_pixels import PCPixels
         return(PCPixels(brightness))
-    else:
+    elif backend == PIXELS_PC_TEXTURE:
+        from lib.pc_pixels import PCTexturePixels
+        return(PCTexturePixels(brightness))
+    elif backend == PIXELS_LED:
         from lib.led_pixels import LEDPixels
         return(LEDPixels(screen_def, brightness))
+
+    elif backend == PIXELS_SHARED:
+        from lib.shared_pixels import SharedPixels
+        return(SharedPixels(brightness))
+
+    raise ValueError("Unknown pixels backend: {}".format(backend))
@@ -0,0 +1,122 @@
+import math
+import mmap
+import struct
+import time
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from lib.framebuffer import *
+from lib.pixels import *
+
+MAGIC = b"LEDR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBHH")          # magic, version, columns, rows
+_RECORD_TYPE = struct.Struct("<B")
+_BRIGHTNESS = struct.Struct("<Hd")         # level, brightness (NaN for None)
+_FRAME = struct.Struct("<dH")              # seconds since start, changed cells
+_CELL = struct.Struct("<HBH")              # index, color, level
+
+_RECORD_BRIGHTNESS = 1
+_RECORD_FRAME = 2
+
+class FrameRecorder:
+    def __init__(self, filename: str, num_columns: int, num_rows: int):
+        self._file: BinaryIO = open(filename, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, num_columns, num_rows))
+
+        self._previous = FrameBuffer(num_columns, num_rows)
+        self._brightnesses = 1
+        self._generation = 0
+        self._start_time = time.perf_counter()
+        self.frames = 0
+
+    def record(self, frame: FrameBuffer):
+        previous = self._previous
+        rebased = frame.generation != self._generation
+        if not rebased and frame.colors == previous.colors and frame.levels == previous.levels:
+            return
+
+        brightnesses = frame.get_brightnesses()
+        first_level = 0 if rebased else self._brightnesses
+        for level in range(first_level, len(brightnesses)):
+            brightness = brightnesses[level]
+            self._file.write(_RECORD_TYPE.pack(_RECORD_BRIGHTNESS))
+            self._file.write(_BRIGHTNESS.pack(level,
+                math.nan if brightness == None else brightness))
+        self._brightnesses = len(brightnesses)
+        self._generation = frame.generation
+
+        colors = frame.colors
+        levels = frame.levels
+        changed = [index for index in range(frame.size) if rebased or
+            colors[index] != previous.colors[index] or levels[index] != previous.levels[index]]
+
+        record = bytearray(_RECORD_TYPE.pack(_RECORD_FRAME))
+        record += _FRAME.pack(time.perf_counter() - self._start_time, len(changed))
+        for index in changed:
+            record += _CELL.pack(index, colors[index], levels[index])
+        self._file.write(record)
+
+        previous.copy_from(frame)
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+class FrameLog:
+    def __init__(self, filename: str):
+        self._file = open(filename, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, self.num_columns, self.num_rows = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a frame recording: {}".format(filename))
+
+    def frames(self) -> Iterator[Tuple[float, FrameBuffer]]:
+        data = self._data
+        frame = FrameBuffer(self.num_columns, self.num_rows)
+        level_map: List[Optional[float]] = [None]
+        offset = _HEADER.size
+
+        while offset < len(data):
+            (record_type,) = _RECORD_TYPE.unpack_from(data, offset)
+            offset += _RECORD_TYPE.size
+
+            if record_type == _RECORD_BRIGHTNESS:
+                level, brightness = _BRIGHTNESS.unpack_from(data, offset)
+                offset += _BRIGHTNESS.size
+
+                value: Optional[float] = None if math.isnan(brightness) else brightness
+                while len(level_map) <= level:
+                    level_map.append(None)
+                level_map[level] = value
+
+            elif record_type == _RECORD_FRAME:
+                timestamp, num_cells = _FRAME.unpack_from(data, offset)
+                offset += _FRAME.size
+
+                for index, color, level in _CELL.iter_unpack(
+                    data[offset:offset + num_cells * _CELL.size]):
+
+                    frame.colors[index] = color
+                    frame.levels[index] = frame.get_level(level_map[level])
+                offset += num_cells * _CELL.size
+
+                yield timestamp, frame
+
+            else:
+                raise ValueError("Corrupt frame recording at offset {}".format(offset))
+
+    def replay(self, pixels: Pixels, speed: float = 1):
+        start_time = time.perf_counter()
+        for timestamp, frame in self.frames():
+            if speed > 0:
+                delay = start_time + timestamp / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            pixels.blit(frame)
+            pixels.update()
+
+    def close(self):
+        self._data.close()
+        self._file.close()
@@ -0,0 +1,235 @@
+import math
+import struct
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable, List, Optional, Tuple
+from lib.colors import *
+from lib.pixels import *
+
+SHARED_NAME = "ledpi_display"
+MAGIC = b"LEDS"
+
+_HEADER = struct.Struct("<4sHHIHxxd")     # magic, columns, rows, sequence, brightnesses,
+                                           # relative brightness
+_SEQUENCE_OFFSET = 8
+_SEQUENCE = struct.Struct("<I")
+_BRIGHTNESSES_OFFSET = 12
+_BRIGHTNESSES = struct.Struct("<H")
+_RELATIVE_OFFSET = 16
+_RELATIVE = struct.Struct("<d")
+_BRIGHTNESS = struct.Struct("<d")          # NaN for None
+_BRIGHTNESS_OFFSET = _HEADER.size
+
+def _get_max_brightnesses(num_columns: int, num_rows: int) -> int:
+    return num_columns * num_rows + 1      # every pixel distinct, plus the default
+
+def _get_colors_offset(num_columns: int, num_rows: int) -> int:
+    return _BRIGHTNESS_OFFSET + _get_max_brightnesses(num_columns, num_rows) * _BRIGHTNESS.size
+
+def _get_size(num_columns: int, num_rows: int) -> int:
+    return _get_colors_offset(num_columns, num_rows) + num_columns * num_rows * 3
+
+class _SharedFrame:
+    def __init__(self, memory: shared_memory.SharedMemory, num_columns: int, num_rows: int):
+        self.memory = memory
+        self.num_columns = num_columns
+        self.num_rows = num_rows
+        self.size = num_columns * num_rows
+        self.max_brightnesses = _get_max_brightnesses(num_columns, num_rows)
+        self._colors_offset = _get_colors_offset(num_columns, num_rows)
+        self._levels_offset = self._colors_offset + self.size
+
+    def clear(self):
+        self.memory.buf[self._colors_offset:self._levels_offset] = (
+            bytes([Color.OFF.value]) * self.size)
+
+    def get_sequence(self) -> int:
+        return _SEQUENCE.unpack_from(self.memory.buf, _SEQUENCE_OFFSET)[0]
+
+    def set_sequence(self, sequence: int):
+        _SEQUENCE.pack_into(self.memory.buf, _SEQUENCE_OFFSET, sequence & 0xFFFFFFFF)
+
+    def get_relative_brightness(self) -> float:
+        return _RELATIVE.unpack_from(self.memory.buf, _RELATIVE_OFFSET)[0]
+
+    def write(self, frame: FrameBuffer, relative_brightness: float):
+        buf = self.memory.buf
+        brightnesses = frame.get_brightnesses()
+        levels = frame.levels
+        if len(brightnesses) > self.max_brightnesses:
+            brightnesses, levels = self._compact(brightnesses, levels)
+
+        sequence = self.get_sequence() + 1
+        self.set_sequence(sequence)
+
+        _BRIGHTNESSES.pack_into(buf, _BRIGHTNESSES_OFFSET, len(brightnesses))
+        _RELATIVE.pack_into(buf, _RELATIVE_OFFSET, relative_brightness)
+        for level, brightness in enumerate(brightnesses):
+            _BRIGHTNESS.pack_into(buf, _BRIGHTNESS_OFFSET + level * _BRIGHTNESS.size,
+                math.nan if brightness == None else brightness)
+
+        buf[self._colors_offset:self._levels_offset] = frame.colors
+        buf[self._levels_offset:self._levels_offset + self.size * 2] = levels.tobytes()
+
+        self.set_sequence(sequence + 1)
+
+    def _compact(self, brightnesses: List[Optional[float]], levels: array
+        ) -> Tuple[List[Optional[float]], array]:
+
+        live_levels = sorted(set(levels))
+        remap = {level: new_level for new_level, level in enumerate(live_levels)}
+        return ([brightnesses[level] for level in live_levels],
+            array("H", [remap[level] for level in levels]))
+
+    def read(self, frame: FrameBuffer) -> Optional[int]:
+        buf = self.memory.buf
+        sequence = self.get_sequence()
+        if sequence % 2 == 1:
+            return None
+
+        (num_brightnesses,) = _BRIGHTNESSES.unpack_from(buf, _BRIGHTNESSES_OFFSET)
+        brightnesses: List[Optional[float]] = []
+        for level in range(num_brightnesses):
+            (brightness,) = _BRIGHTNESS.unpack_from(buf,
+                _BRIGHTNESS_OFFSET + level * _BRIGHTNESS.size)
+            brightnesses.append(None if math.isnan(brightness) else brightness)
+
+        colors = bytes(buf[self._colors_offset:self._levels_offset])
+        levels = bytes(buf[self._levels_offset:self._levels_offset + self.size * 2])
+
+        if self.get_sequence() != sequence:
+            return None
+
+        frame.set_brightnesses(brightnesses)
+        frame.colors[:] = colors
+        frame.levels[:] = array("H", levels)
+        return sequence
+
+class DisplayOwner:
+    POLL_INTERVAL = 1 / 1000
+    MAX_POLL_INTERVAL = 1 / 50
+
+    def __init__(self, pixels: Pixels, name: str = SHARED_NAME):
+        self._pixels = pixels
+        num_columns = pixels.get_num_columns()
+        num_rows = pixels.get_num_rows()
+
+        size = _get_size(num_columns, num_rows)
+        try:
+            memory = shared_memory.SharedMemory(name, create = True, size = size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            memory = shared_memory.SharedMemory(name, create = True, size = size)
+        _HEADER.pack_into(memory.buf, 0, MAGIC, num_columns, num_rows, 0, 1,
+            pixels.get_relative_brightness())
+        _BRIGHTNESS.pack_into(memory.buf, _BRIGHTNESS_OFFSET, math.nan)
+        self._shared = _SharedFrame(memory, num_columns, num_rows)
+        self._shared.clear()
+        self._frame = FrameBuffer(num_columns, num_rows)
+        self._sequence = 0
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        interval = self.POLL_INTERVAL
+        try:
+            while self._running:
+                if self.poll():
+                    interval = self.POLL_INTERVAL
+                else:
+                    time.sleep(interval)
+                    interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+        finally:
+            self.close()
+
+    def poll(self) -> bool:
+        if self._shared.get_sequence() == self._sequence:
+            return False
+
+        sequence = self._shared.read(self._frame)
+        if sequence == None:
+            return False
+
+        self._sequence = sequence
+        relative_brightness = self._shared.get_relative_brightness()
+        if relative_brightness != self._pixels.get_relative_brightness():
+            self._pixels.set_brightness(relative_brightness = relative_brightness)
+
+        self._pixels.blit(self._frame)
+        self._pixels.update()
+        return True
+
+    def close(self):
+        self._pixels.fill(Color.OFF)
+        self._pixels.update()
+        self._pixels.close()
+        self._shared.memory.close()
+        self._shared.memory.unlink()
+
+class SharedPixels(Pixels):
+    _BASE_BRIGHTNESS = 92
+    _MAX_BRIGHTNESS = 255
+    ATTACH_TIMEOUT = 30
+    ATTACH_INTERVAL = 0.1
+
+    def __init__(self, relative_brightness: Optional[float] = None, name: str = SHARED_NAME):
+        super().__init__(self._BASE_BRIGHTNESS, self._MAX_BRIGHTNESS, relative_brightness)
+
+        memory, num_columns, num_rows = self._attach(name)
+        self._shared = _SharedFrame(memory, num_columns, num_rows)
+        self._frame = FrameBuffer(num_columns, num_rows)
+
+    def _attach(self, name: str) -> Tuple[shared_memory.SharedMemory, int, int]:
+        deadline = time.monotonic() + self.ATTACH_TIMEOUT
+        while True:
+            try:
+                memory = shared_memory.SharedMemory(name)
+            except FileNotFoundError:
+                memory = None
+
+            if memory != None:
+                try:
+                    resource_tracker.unregister(memory._name, "shared_memory")
+                except Exception:
+                    pass
+
+                if memory.size >= _HEADER.size:
+                    magic, num_columns, num_rows, _, _, _ = _HEADER.unpack_from(memory.buf, 0)
+                    if magic == MAGIC:
+                        return memory, num_columns, num_rows
+                memory.close()
+
+            if time.monotonic() >= deadline:
+                if memory == None:
+                    raise TimeoutError("Shared display {} not found after {} seconds, "
+                        "is display.py running?".format(name, self.ATTACH_TIMEOUT))
+                raise ValueError("Not a shared display: {}".format(name))
+            time.sleep(self.ATTACH_INTERVAL)
+
+    def get_num_columns(self) -> int:
+        return self._frame.num_columns
+
+    def get_num_rows(self) -> int:
+        return self._frame.num_rows
+
+    def update(self):
+        self._shared.write(self._frame, self._relative_brightness)
+
+    def fill(self, color: Color, brightness: Optional[float] = None):
+        self._frame.fill(color, brightness)
+
+    def set_pixel(self, column_num: int, row_num: int, color: Color,
+        brightness: Optional[float] = None):
+
+        self._frame.set_pixel(column_num, row_num, color, brightness)
+
+    def blit(self, frame: FrameBuffer, indices: Optional[Iterable[int]] = None):
+        self._frame.copy_from(frame)
+
+    def close(self):
+        self._shared.memory.close()
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from sqlite3 import PARSE_COLNAMES
+from lib.startup import *
 from lib.util import *
+from typing import Dict
 import os
 
 AUDIO_DIR = "audio"
@@ -25,6 +26,7 @@ class Sound(ABC):
     def __init__(self, volume: int, muted: bool):
         self.set_volume(volume)
         self._muted = muted
+        self._samples: Dict[str, SoundSample] = {}
 
     def get_volume(self) -> int:
         return self._volume
@@ -55,14 +57,23 @@ class Sound(ABC):
         volume = between_int(volume, 0, 100)
         self.set_volume(volume)
 
-    @abstractmethod
     def get(self, filename: str) -> SoundSample:
+        sample = self._samples.get(filename)
+        if sample == None:
+            with startup_trace("load", filename):
+                sample = self._load(filename)
+            self._samples[filename] = sample
+        return sample
+
+    @abstractmethod
+    def _load(self, filename: str) -> SoundSample:
         raise NotImplementedError
 
 def SoundFactory(volume: int, muted: bool) -> Sound:
-    if os.name == "nt":
-        from lib.pc_sound import PCSound
-        return PCSound(volume, muted)
-    else:
-        from lib.pi_sound import PiSound
-        return PiSound(volume, muted)
+    with startup_trace("open", "sound"):
+        if os.name == "nt":
+            from lib.pc_sound import PCSound
+            return PCSound(volume, muted)
+        else:
+            from lib.pi_sound import PiSound
+            return PiSound(volume, muted)
@@ -1,9 +1,11 @@
-import csv
+import math
+from array import array
 from enum import IntEnum
 from lib.screen import *
 from lib.util import *
 from lib.colors import *
-from typing import List, Tuple, Dict
+from lib.assets import *
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
 
 class SpriteID(IntEnum):
     BULLET = 0
@@ -43,8 +45,19 @@ class MoveDirection(Enum):
     RIGHT = 3
 
 class Sprite:
-    def __init__(self, definition: List[List[List[Color]]], screen: Screen):
+    def __init__(self, definition: List[List[List[Color]]], screen: Screen,
+        masks: Optional[List[List[int]]] = None,
+        points: Optional[List[List[Tuple[int, int, Color]]]] = None):
+
         self._definition = definition
+        if masks == None:
+            masks = [build_masks(form) for form in definition]
+        self._masks = masks
+        if points == None:
+            points = [build_points(form) for form in definition]
+        self._points = points
+        self._draw_lists: Dict[Tuple[int, Optional[Color]], List[Tuple[int, int, int]]] = {}
+        self._erase_lists: Dict[Tuple[int, int, int], List[Tuple[int, int, int]]] = {}
         self._screen = screen
         self._form = 0
         self._column = 0
@@ -52,10 +65,12 @@ class Sprite:
         self._brightness = None
         self._visible = False
         self._under_save = []
+        self._grids: List["OccupancyGrid"] = []
 
     def set_position(self, column: int, row: int):
         self._column = column
         self._row = row
+        self._update_grids()
         self.draw()
 
     def get_column(self) -> int:
@@ -79,7 +94,7 @@ class Sprite:
     def set_brightness(self, brightness: Optional[float] = None):
         self._brightness = brightness
 
-    def move(self, direction: MoveDirection, outside = 0, walls: List["Sprite"] = [],
+    def move(self, direction: MoveDirection, outside = 0, walls: "SpriteGroup" = [],
         pulsate: bool = False, under_save = False, skip_draw = False) -> bool:
         
         if pulsate:
@@ -105,54 +120,104 @@ class Sprite:
             if (new_column + self.get_width()) > (self._screen.pixels.get_num_columns() + outside):
                 return False
 
-        if len(self.get_collisions(walls, if_my_position = [new_column, new_row])) > 0:
+        if self.any_collision(walls, if_my_position = [new_column, new_row]):
             return False
 
-        if under_save:
-            for under in self._under_save:
-                self._screen.set_pixel(under[0], under[1], under[2], under[3])
-        elif not skip_draw:
-            self.erase()
-        
+        if skip_draw:
+            if under_save:
+                for under in self._under_save:
+                    self._screen.set_pixel(under[0], under[1], under[2], under[3])
+        elif under_save:
+            self._move_under_save(new_column, new_row)
+        else:
+            self._screen.draw_points(self._column, self._row,
+                self._get_erase_list(new_column - self._column, new_row - self._row),
+                self._brightness)
+
         self._column = new_column
         self._row = new_row
+        self._update_grids()
         if not skip_draw:
-            self.draw(under_save = under_save)
+            self.draw()
         return True
 
-    def draw(self, color: Optional[Color] = None, brightness: Optional[float] = None,
-        under_save = False):
+    def _get_erase_list(self, column_shift: int, row_shift: int) -> List[Tuple[int, int, int]]:
+        key = (self._form, column_shift, row_shift)
+        erase_list = self._erase_lists.get(key)
+        if erase_list == None:
+            points = self._points[self._form]
+            offsets = {(column, row) for column, row, _ in points}
+            erase_list = [(column, row, Color.OFF.value) for column, row, _ in points
+                if (column - column_shift, row - row_shift) not in offsets]
+            self._erase_lists[key] = erase_list
+        return erase_list
+
+    def _move_under_save(self, new_column: int, new_row: int):
+        screen = self._screen
+        saved = {(under[0], under[1]): under for under in self._under_save}
 
-        self._visible = color != Color.OFF
+        self._under_save = []
+        for column_offset, row_offset, _ in self._points[self._form]:
+            column = new_column + column_offset
+            row = new_row + row_offset
+            if not screen.on_screen(column, row):
+                continue
 
-        if under_save:
-            self._under_save = []
+            under = saved.pop((column, row), None)
+            if under == None:
+                old_color, old_brightness = screen.get_pixel(column, row)
+                under = [column, row, old_color, old_brightness]
+            self._under_save.append(under)
 
-        for num_row, sprite_row in enumerate(self._definition[self._form]):
-            for num_column, pixel_color in enumerate(sprite_row):
-                if pixel_color == Color.OFF:
-                    continue
-                
-                if color != None:
-                    pixel_color = color
+        for under in saved.values():
+            screen.set_pixel(under[0], under[1], under[2], under[3])
 
-                pixel_brightness = self._brightness
-                if brightness != None:
-                    pixel_brightness = brightness
+    def draw(self, color: Optional[Color] = None, brightness: Optional[float] = None,
+        under_save = False):
 
-                column = self._column + num_column
-                row = self._row + num_row
+        self._visible = color != Color.OFF
 
-                if under_save and self._screen.on_screen(column, row):
-                    old_color, old_brightness = self._screen.get_pixel(column, row)
-                    self._under_save.append([column, row, old_color, old_brightness])
+        screen = self._screen
+        column = self._column
+        row = self._row
+        draw_list = self._get_draw_list(color)
 
-                self._screen.set_pixel(column, row, pixel_color, pixel_brightness)
+        if under_save:
+            self._under_save = []
+            for column_offset, row_offset, _ in draw_list:
+                if screen.on_screen(column + column_offset, row + row_offset):
+                    old_color, old_brightness = screen.get_pixel(column + column_offset,
+                        row + row_offset)
+                    self._under_save.append([column + column_offset, row + row_offset,
+                        old_color, old_brightness])
+
+        if brightness == None:
+            brightness = self._brightness
+
+        form = self._definition[self._form]
+        clip = not (column >= 0 and row >= 0 and len(form) > 0 and
+            column + len(form[0]) <= screen.last_column + 1 and
+            row + len(form) <= screen.last_row + 1)
+
+        screen.draw_points(column, row, draw_list, brightness, clip)
+
+    def _get_draw_list(self, color: Optional[Color]) -> List[Tuple[int, int, int]]:
+        key = (self._form, color)
+        draw_list = self._draw_lists.get(key)
+        if draw_list == None:
+            points = self._points[self._form]
+            if color == None:
+                draw_list = [(column, row, point_color.value) for column, row, point_color
+                    in points]
+            else:
+                draw_list = [(column, row, color.value) for column, row, _ in points]
+            self._draw_lists[key] = draw_list
+        return draw_list
 
     def erase(self):
         self.draw(color = Color.OFF)
 
-    def transform(self, form: Optional[int] = None, walls: List["Sprite"] = [],
+    def transform(self, form: Optional[int] = None, walls: "SpriteGroup" = [],
         skip_draw: bool = False) -> bool:
         
         if form == None:
@@ -164,14 +229,16 @@ class Sprite:
         if new_form > max_form:
             new_form = 0
 
-        if len(self.get_collisions(walls, if_my_form = new_form)) > 0:
+        if self.any_collision(walls, if_my_form = new_form):
             return False
 
         if skip_draw:
             self._form = new_form
+            self._update_grids()
         else:
             self.erase()
             self._form = new_form
+            self._update_grids()
             self.draw()
 
         return True
@@ -179,13 +246,10 @@ class Sprite:
     def fragment(self) -> List["Sprite"]:
         self.erase()
         sprites: List[Sprite] = []
-        for num_row, sprite_row in enumerate(self._definition[self._form]):
-            for num_column, pixel_color in enumerate(sprite_row):
-                if pixel_color == Color.OFF:
-                    continue
-                sprite = Sprite([[[pixel_color]]], self._screen)
-                sprite.set_position(self._column + num_column, self._row + num_row)
-                sprites.append(sprite)
+        for num_column, num_row, pixel_color in self._points[self._form]:
+            sprite = Sprite([[[pixel_color]]], self._screen)
+            sprite.set_position(self._column + num_column, self._row + num_row)
+            sprites.append(sprite)
         return sprites
 
     def get_height(self) -> int:
@@ -197,6 +261,9 @@ class Sprite:
     def is_colliding(self, sprite: "Sprite", if_my_position: Optional[List[int]] = None,
         if_my_form: Optional[int] = None) -> bool:
         
+        if not (self._visible and sprite._visible):
+            return False
+
         column = self._column
         row = self._row
         form = self._form
@@ -208,30 +275,52 @@ class Sprite:
         if if_my_form != None:
             form = if_my_form
 
-        cells: Dict[str, bool] = {}
-        
-        if not (self._visible and sprite._visible):
+        masks = self._masks[form]
+        other_masks = sprite._masks[sprite._form]
+        if len(masks) == 0 or len(other_masks) == 0:
             return False
 
-        for num_row, sprite_row in enumerate(self._definition[form]):
-            for num_column, color in enumerate(sprite_row):
-                if color != Color.OFF:
-                    key = "{},{}".format(column + num_column, row + num_row)
-                    cells[key] = True
-        
-        for num_row, sprite_row in enumerate(sprite._definition[sprite._form]):
-            for num_column, color in enumerate(sprite_row):
-                if color != Color.OFF:
-                    key = "{},{}".format(sprite._column + num_column, sprite._row + num_row)
-                    if cells.get(key):
-                        return True
-        
+        other_column = sprite._column
+        other_row = sprite._row
+        if (column >= other_column + len(sprite._definition[sprite._form][0]) or
+            other_column >= column + len(self._definition[form][0]) or
+            row >= other_row + len(other_masks) or other_row >= row + len(masks)):
+
+            return False
+
+        shift = other_column - column
+        for num_row in range(max_int(row, other_row), min_int(row + len(masks),
+            other_row + len(other_masks))):
+
+            mask = masks[num_row - row]
+            other_mask = other_masks[num_row - other_row]
+            if shift >= 0:
+                other_mask <<= shift
+            else:
+                mask <<= -shift
+
+            if mask & other_mask:
+                return True
+
         return False
 
-    def get_collisions(self, sprites: List["Sprite"],
+    def covers(self, column: int, row: int) -> bool:
+        if not self._visible:
+            return False
+
+        masks = self._masks[self._form]
+        mask_row = row - self._row
+        mask_column = column - self._column
+        return (0 <= mask_row < len(masks) and mask_column >= 0 and
+            (masks[mask_row] >> mask_column) & 1 == 1)
+
+    def get_collisions(self, sprites: "SpriteGroup",
         if_my_position: Optional[List[int]] = None, if_my_form: Optional[int] = None
         ) -> List["Sprite"]:
         
+        if isinstance(sprites, OccupancyGrid):
+            return sprites.get_collisions(self, if_my_position, if_my_form)
+
         collisions: List["Sprite"] = []
 
         for sprite in sprites:
@@ -240,86 +329,348 @@ class Sprite:
 
         return collisions
 
-class Sprites:
-    def __init__(self, definition_filename: str, screen: Screen):
-        self._screen = screen
-        definition_file = open(definition_filename)
-        definition_reader = csv.reader(definition_file)
+    def any_collision(self, sprites: "SpriteGroup", if_my_position: Optional[List[int]] = None,
+        if_my_form: Optional[int] = None) -> bool:
 
-        self._sprite_definitions = []
-        while True:
-            animation = []
-            animation_width = 0
+        if isinstance(sprites, OccupancyGrid):
+            return sprites.any_collision(self, if_my_position, if_my_form)
 
-            for row in definition_reader:
-                row_width = 0
-                for column, element in enumerate(row):
-                    if element != "":
-                        row_width = column + 1
+        for sprite in sprites:
+            if self.is_colliding(sprite, if_my_position, if_my_form):
+                return True
 
-                if row_width == 0:
-                    break
+        return False
 
-                if row_width > animation_width:
-                    animation_width = row_width
+    def _update_grids(self):
+        for grid in self._grids:
+            grid.update(self)
+
+def build_points(colors: List[List[Color]]) -> List[Tuple[int, int, Color]]:
+    return [(num_column, num_row, color) for num_row, row in enumerate(colors)
+        for num_column, color in enumerate(row) if color != Color.OFF]
+
+class OccupancyGrid:
+    def __init__(self, screen: Screen, sprites: Iterable[Sprite] = []):
+        self._num_columns = screen.pixels.get_num_columns()
+        self._num_rows = screen.pixels.get_num_rows()
+        self._cells: List[Set[int]] = [set() for _ in range(self._num_columns * self._num_rows)]
+        self._overflow: Set[int] = set()
+
+        self._sprites: Dict[int, Sprite] = {}
+        self._ids: Dict[Sprite, int] = {}
+        self._footprints: Dict[int, Set[int]] = {}
+        self._next_id = 0
+        self.extend(sprites)
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def __iter__(self) -> Iterator[Sprite]:
+        return iter(list(self._sprites.values()))
+
+    def __contains__(self, sprite: Sprite) -> bool:
+        return sprite in self._ids
+
+    def append(self, sprite: Sprite):
+        if sprite in self._ids:
+            return
+
+        sprite_id = self._next_id
+        self._next_id += 1
+        self._sprites[sprite_id] = sprite
+        self._ids[sprite] = sprite_id
+        self._footprints[sprite_id] = set()
+        sprite._grids.append(self)
+        self.update(sprite)
+
+    def extend(self, sprites: Iterable[Sprite]):
+        for sprite in sprites:
+            self.append(sprite)
+
+    def remove(self, sprite: Sprite):
+        sprite_id = self._ids.pop(sprite, None)
+        if sprite_id == None:
+            raise ValueError("Sprite not in occupancy grid")
+
+        for cell in self._footprints.pop(sprite_id):
+            self._cells[cell].discard(sprite_id)
+        self._overflow.discard(sprite_id)
+        del self._sprites[sprite_id]
+        sprite._grids.remove(self)
+
+    def update(self, sprite: Sprite):
+        sprite_id = self._ids[sprite]
+        footprint = self._footprints[sprite_id]
+        cells, outside = self._get_cells(sprite._column, sprite._row, sprite._masks[sprite._form])
+
+        for cell in footprint - cells:
+            self._cells[cell].discard(sprite_id)
+        for cell in cells - footprint:
+            self._cells[cell].add(sprite_id)
+        self._footprints[sprite_id] = cells
+
+        if outside:
+            self._overflow.add(sprite_id)
+        else:
+            self._overflow.discard(sprite_id)
+
+    def _get_cells(self, column: int, row: int, masks: List[int]) -> Tuple[Set[int], bool]:
+        cells: Set[int] = set()
+        outside = False
+
+        for num_row, mask in enumerate(masks):
+            cell_row = row + num_row
+            cell_column = column
+            while mask:
+                if mask & 1:
+                    if (0 <= cell_column < self._num_columns and
+                        0 <= cell_row < self._num_rows):
+
+                        cells.add(cell_row * self._num_columns + cell_column)
+                    else:
+                        outside = True
+                mask >>= 1
+                cell_column += 1
+
+        return cells, outside
+
+    def get_sprite_at(self, column: int, row: int) -> Optional[Sprite]:
+        if 0 <= column < self._num_columns and 0 <= row < self._num_rows:
+            sprite_ids = self._cells[row * self._num_columns + column]
+        else:
+            sprite_ids = self._overflow
 
-                animation.append(row)
+        for sprite_id in sorted(sprite_ids):
+            sprite = self._sprites[sprite_id]
+            if sprite.covers(column, row):
+                return sprite
 
-            if animation_width == 0:
-                break
+        return None
 
-            trimmed_animation = []
-            for row in animation:
-                trimmed_animation.append(row[:animation_width])
+    def _get_candidates(self, sprite: Sprite, if_my_position: Optional[List[int]],
+        if_my_form: Optional[int]) -> List[Sprite]:
 
-            self._sprite_definitions.append(
-                self._split_sprite_animation(trimmed_animation, animation_width))
+        column = sprite._column
+        row = sprite._row
+        form = sprite._form
 
-    def _split_sprite_animation(self, animation: List[List[str]], width: int) -> (
-            List[List[List[Color]]]):
-        
-        sprites = []
-
-        while width > 0:
-            sprite_width = width
-            for color in range(width):
-                is_empty_column = True
-
-                for row in range(len(animation)):
-                    if animation[row][color] != "":
-                        is_empty_column = False
-                        break
-
-                if is_empty_column:
-                    sprite_width = color
-                    break
-
-            sprite = []
-            for i, row in enumerate(animation):
-                sprite_row = row[:sprite_width]
-                animation[i] = row[sprite_width + 1:]
-                if any(cell != "" for cell in sprite_row):
-                    sprite.append(sprite_row)
-            
-            for num_row, row in enumerate(sprite):
-                for num_column, color in enumerate(row):
-                    sprite[num_row][num_column] = Colors().get(color)
-
-            width = len(animation[0])
-            sprites.append(sprite)
+        if if_my_position != None:
+            column = if_my_position[0]
+            row = if_my_position[1]
 
-        return sprites
+        if if_my_form != None:
+            form = if_my_form
+
+        cells, _ = self._get_cells(column, row, sprite._masks[form])
+        candidates = set(self._overflow)
+        for cell in cells:
+            candidates.update(self._cells[cell])
+
+        return [self._sprites[sprite_id] for sprite_id in sorted(candidates)]
+
+    def get_collisions(self, sprite: Sprite, if_my_position: Optional[List[int]] = None,
+        if_my_form: Optional[int] = None) -> List[Sprite]:
+
+        return [candidate for candidate in
+            self._get_candidates(sprite, if_my_position, if_my_form)
+            if sprite.is_colliding(candidate, if_my_position, if_my_form)]
+
+    def any_collision(self, sprite: Sprite, if_my_position: Optional[List[int]] = None,
+        if_my_form: Optional[int] = None) -> bool:
+
+        for candidate in self._get_candidates(sprite, if_my_position, if_my_form):
+            if sprite.is_colliding(candidate, if_my_position, if_my_form):
+                return True
+
+        return False
+
+SpriteGroup = Union[List[Sprite], OccupancyGrid]
+
+def get_sprite_at(sprites: SpriteGroup, column: int, row: int) -> Optional[Sprite]:
+    if isinstance(sprites, OccupancyGrid):
+        return sprites.get_sprite_at(column, row)
+
+    for sprite in sprites:
+        if sprite.covers(column, row):
+            return sprite
+
+    return None
+
+class ProjectilePool:
+    def __init__(self, screen: Screen, template: Sprite, size: int,
+        brightness: Optional[float] = None, outside: int = 0):
+
+        self._screen = screen
+        self._points = template._points
+        self._brightness = brightness
+        self._min_column = -outside
+        self._min_row = -outside
+        self._max_column = screen.last_column + outside
+        self._max_row = screen.last_row + outside
+
+        self._columns = array("d", [0]) * size
+        self._rows = array("d", [0]) * size
+        self._column_speeds = array("d", [0]) * size
+        self._row_speeds = array("d", [0]) * size
+        self._forms = array("B", [0]) * size
+        self._drawn_columns = array("i", [0]) * size
+        self._drawn_rows = array("i", [0]) * size
+        self._drawn = bytearray(size)
+
+        self._active: List[int] = []
+        self._free: List[int] = list(range(size - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def get_width(self, form: int = 0) -> int:
+        return max(column for column, _, _ in self._points[form]) + 1
+
+    def get_height(self, form: int = 0) -> int:
+        return max(row for _, row, _ in self._points[form]) + 1
+
+    def is_full(self) -> bool:
+        return len(self._free) == 0
+
+    def fire(self, column: float, row: float, column_speed: float, row_speed: float,
+        form: int = 0) -> Optional[int]:
+
+        if len(self._free) == 0:
+            return None
+
+        slot = self._free.pop()
+        self._columns[slot] = column
+        self._rows[slot] = row
+        self._column_speeds[slot] = column_speed
+        self._row_speeds[slot] = row_speed
+        self._forms[slot] = form % len(self._points)
+        self._active.append(slot)
+        self._draw(slot)
+        return slot
+
+    def get_position(self, slot: int) -> Tuple[int, int]:
+        return math.floor(self._columns[slot]), math.floor(self._rows[slot])
+
+    def release(self, slot: int):
+        self._erase(slot)
+        self._active.remove(slot)
+        self._free.append(slot)
+
+    def clear(self):
+        for slot in list(self._active):
+            self.release(slot)
+
+    def step(self, targets: SpriteGroup = [], pulsate: bool = False) -> List[Tuple[int, Sprite]]:
+        hits: List[Tuple[int, Sprite]] = []
+        expired: List[int] = []
+
+        for slot in self._active:
+            self._erase(slot)
+
+            from_column, from_row = self.get_position(slot)
+            self._columns[slot] += self._column_speeds[slot]
+            self._rows[slot] += self._row_speeds[slot]
+            to_column, to_row = self.get_position(slot)
+
+            if pulsate:
+                self._forms[slot] = (self._forms[slot] + 1) % len(self._points)
+
+            target = self._sweep(slot, from_column, from_row, to_column, to_row, targets)
+            if target != None:
+                hits.append((slot, target))
+                expired.append(slot)
+            elif not self._in_bounds(slot, to_column, to_row):
+                expired.append(slot)
+            else:
+                self._draw(slot)
+
+        for slot in expired:
+            self._active.remove(slot)
+            self._free.append(slot)
+
+        return hits
+
+    def collide(self, targets: SpriteGroup) -> List[Tuple[int, Sprite]]:
+        hits: List[Tuple[int, Sprite]] = []
+        for slot in list(self._active):
+            column, row = self.get_position(slot)
+            target = self._get_target(slot, column, row, targets)
+            if target != None:
+                hits.append((slot, target))
+                self.release(slot)
+        return hits
+
+    def _sweep(self, slot: int, from_column: int, from_row: int, to_column: int, to_row: int,
+        targets: SpriteGroup) -> Optional[Sprite]:
+
+        steps = max_int(max_int(abs(to_column - from_column), abs(to_row - from_row)), 1)
+        for step in range(1, steps + 1):
+            column = from_column + round((to_column - from_column) * step / steps)
+            row = from_row + round((to_row - from_row) * step / steps)
+            target = self._get_target(slot, column, row, targets)
+            if target != None:
+                return target
+        return None
+
+    def _get_target(self, slot: int, column: int, row: int, targets: SpriteGroup
+        ) -> Optional[Sprite]:
+
+        for column_offset, row_offset, _ in self._points[self._forms[slot]]:
+            target = get_sprite_at(targets, column + column_offset, row + row_offset)
+            if target != None:
+                return target
+        return None
+
+    def _in_bounds(self, slot: int, column: int, row: int) -> bool:
+        for column_offset, row_offset, _ in self._points[self._forms[slot]]:
+            if (self._min_column <= column + column_offset <= self._max_column and
+                self._min_row <= row + row_offset <= self._max_row):
+
+                return True
+        return False
+
+    def _draw(self, slot: int):
+        column, row = self.get_position(slot)
+        for column_offset, row_offset, color in self._points[self._forms[slot]]:
+            self._screen.set_pixel(column + column_offset, row + row_offset, color,
+                self._brightness)
+
+        self._drawn_columns[slot] = column
+        self._drawn_rows[slot] = row
+        self._drawn[slot] = 1
+
+    def _erase(self, slot: int):
+        if not self._drawn[slot]:
+            return
+
+        column = self._drawn_columns[slot]
+        row = self._drawn_rows[slot]
+        for column_offset, row_offset, _ in self._points[self._forms[slot]]:
+            self._screen.set_pixel(column + column_offset, row + row_offset, Color.OFF,
+                self._brightness)
+        self._drawn[slot] = 0
+
+class Sprites:
+    def __init__(self, definition_filename: str, screen: Screen):
+        self._screen = screen
+        self._sprite_forms = load_sprites(definition_filename)
+        self._sprite_definitions = [[form.colors for form in forms]
+            for forms in self._sprite_forms]
+        self._sprite_masks = [[form.masks for form in forms] for forms in self._sprite_forms]
+        self._sprite_points = [[build_points(form.colors) for form in forms]
+            for forms in self._sprite_forms]
 
     def get(self, sprite: SpriteID) -> Sprite:
-        return Sprite(self._sprite_definitions[sprite], self._screen)
+        return Sprite(self._sprite_definitions[sprite], self._screen, self._sprite_masks[sprite],
+            self._sprite_points[sprite])
 
     def test(self):
         screen = self._screen
         screen.clear()
 
         sprites: List[Sprite] = []
-        for sprite_definition in self._sprite_definitions:
-            sprites.append(Sprite(sprite_definition, self._screen))
+        for sprite_id in range(len(self._sprite_definitions)):
+            sprites.append(self.get(sprite_id))
 
         max_width = 0
         column = 0
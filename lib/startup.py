@@ -0,0 +1,47 @@
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+STARTUP_TRACE_ENV = "LEDPI_STARTUP_TRACE"
+
+_enabled = os.environ.get(STARTUP_TRACE_ENV, "") not in ["", "0"]
+_start_time = time.perf_counter()
+_depth = 0
+_original_import = builtins.__import__
+
+def is_startup_trace_enabled() -> bool:
+    return _enabled
+
+def _report(kind: str, label: str, duration: float):
+    elapsed = time.perf_counter() - _start_time
+    print("[startup] {:8.1f} ms {:8.1f} ms  {}{} {}".format(elapsed * 1000, duration * 1000,
+        "  " * _depth, kind, label), file = sys.stderr)
+
+@contextmanager
+def startup_trace(kind: str, label: str) -> Iterator[None]:
+    global _depth
+
+    if not _enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        _report(kind, label, time.perf_counter() - start)
+
+def _traced_import(name, globals = None, locals = None, fromlist = (), level = 0):
+    if level != 0 or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    with startup_trace("import", name):
+        return _original_import(name, globals, locals, fromlist, level)
+
+if _enabled:
+    builtins.__import__ = _traced_import
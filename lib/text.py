@@ -1,8 +1,16 @@
-import csv
 import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from lib.assets import *
 from lib.screen import *
 
+class RenderedText:
+    def __init__(self, width: int, points: List[Tuple[int, int, int]]):
+        self.width = width
+        self.points = points
+
 class Text:
+    RENDER_CACHE_SIZE = 64
     _symbols = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 
         'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 
         '1', '2', '3', '4', '5', '6', '7', '8', '9', '0']
@@ -10,61 +18,63 @@ class Text:
 
     def __init__(self, definition_filename: str, screen: Screen):
         self._screen = screen
-        definition_file = open(definition_filename)
-        definition_reader = csv.reader(definition_file)
-
-        self._fonts = []
-        i = 0
-        for row in definition_reader:
-            if i == self.font_height:
-                i = 0
-                continue
-            self._fonts.append(row)
-            i += 1
 
-        self._max_font_width = len(self._fonts[0])
+        self._font = load_font(definition_filename, self.font_height)
+        self._max_font_width = self._font.max_width
+        self._glyphs: Dict[str, int] = {symbol: index for index, symbol in enumerate(self._symbols)}
+        self._rendered: "OrderedDict[Tuple[str, Color], RenderedText]" = OrderedDict()
 
     def write_letter(self, letter: str, column: int, row: int, color: Color,
         brightness: Optional[float] = None) -> int:
 
-        letter_index = self._symbols.index(letter)
-        font_index = letter_index * self.font_height
+        letter_index = self._glyphs[letter]
+        points: List[Tuple[int, int, int]] = []
+        self._add_glyph(points, letter_index, 0, color)
+        self._screen.draw_points(column, row, points, brightness)
 
-        for font_column in range(self._max_font_width):
-            empty_column = True
-            for i in range(self.font_height):
-                if self._fonts[font_index + i][font_column] != "":
-                    empty_column = False
-                    break
-            if empty_column:
-                return font_column
+        return self._font.widths[letter_index]
 
-            pixel_column = column + font_column
-            pixel_row = row
+    def _add_glyph(self, points: List[Tuple[int, int, int]], letter_index: int, column: int,
+        color: Color):
 
-            for font_row in range(font_index, font_index + self.font_height):        
+        for font_column, mask in enumerate(self._font.columns[letter_index]):
+            for font_row in range(self.font_height):
                 pixel_color = color
-                if self._fonts[font_row][font_column] == "":
+                if not mask & (1 << font_row):
                     pixel_color = Color.OFF
 
-                self._screen.set_pixel(pixel_column, pixel_row, pixel_color, brightness)
-                pixel_row += 1
+                points.append((column + font_column, font_row, pixel_color.value))
 
-        return self._max_font_width
+    def render(self, text: str, color: Color) -> RenderedText:
+        key = (text, color)
+        rendered = self._rendered.get(key)
+        if rendered != None:
+            self._rendered.move_to_end(key)
+            return rendered
 
-    def write_at(self, text: str, column: int, row: int, color: Color,
-        brightness: Optional[float] = None) -> int:
-        
-        first = True
+        points: List[Tuple[int, int, int]] = []
+        column = 0
         for letter in text:
             if letter == " ":
                 column += 1
                 continue
 
-            letter_width = self.write_letter(letter, column, row, color, brightness)
-            column += letter_width + 1
+            letter_index = self._glyphs[letter]
+            self._add_glyph(points, letter_index, column, color)
+            column += self._font.widths[letter_index] + 1
 
-        return column
+        rendered = RenderedText(column, points)
+        self._rendered[key] = rendered
+        if len(self._rendered) > self.RENDER_CACHE_SIZE:
+            self._rendered.popitem(last = False)
+        return rendered
+
+    def write_at(self, text: str, column: int, row: int, color: Color,
+        brightness: Optional[float] = None) -> int:
+        
+        rendered = self.render(text, color)
+        self._screen.draw_points(column, row, rendered.points, brightness)
+        return column + rendered.width
 
     def write(self, lines, brightness: Optional[float] = None):
         for num_line, line in enumerate(lines):
@@ -89,4 +99,144 @@ class Text:
         self._screen.update()
         time.sleep(1)
         self._screen.clear()
-        
\ No newline at end of file
+        
+class Marquee:
+    def __init__(self, text: Text, message: str, row: int, color: Color,
+        brightness: Optional[float] = None, speed: float = 8, from_column: int = 0,
+        to_column: Optional[int] = None, gap: Optional[int] = None):
+
+        self._text = text
+        self._screen = text._screen
+        self._row = row
+        self._brightness = brightness
+        self._speed = speed
+        self._from_column = from_column
+        self._to_column = to_column if to_column != None else self._screen.last_column
+        self._gap = gap if gap != None else self._to_column - self._from_column + 1
+
+        self._strip: List[List[int]] = []
+        self._offset = -1
+        self._start_position = 0.0
+        self._start_time = time.perf_counter()
+        self.set_message(message, color)
+
+    def set_message(self, message: str, color: Color):
+        rendered = self._text.render(message, color)
+
+        columns = [[Color.OFF.value] * self._text.font_height
+            for _ in range(rendered.width + self._gap)]
+        for column, row, color_value in rendered.points:
+            columns[column][row] = color_value
+
+        self._strip = columns
+        self._offset = -1
+
+    def set_speed(self, speed: float):
+        now = time.perf_counter()
+        self._start_position = self._get_position(now)
+        self._start_time = now
+        self._speed = speed
+
+    def reset(self):
+        self._start_position = 0.0
+        self._start_time = time.perf_counter()
+        self._offset = -1
+
+    def _get_position(self, now: Optional[float] = None) -> float:
+        if now == None:
+            now = time.perf_counter()
+        return self._start_position + (now - self._start_time) * self._speed
+
+    def update(self, now: Optional[float] = None) -> bool:
+        offset = int(self._get_position(now)) % len(self._strip)
+        if offset == self._offset:
+            return False
+        self._offset = offset
+
+        strip = self._strip
+        strip_width = len(strip)
+        points: List[Tuple[int, int, int]] = []
+        for column in range(self._to_column - self._from_column + 1):
+            for row, color_value in enumerate(strip[(offset + column) % strip_width]):
+                points.append((column, row, color_value))
+
+        self._screen.draw_points(self._from_column, self._row, points, self._brightness)
+        return True
+
+class Counter:
+    _DIGITS = "0123456789"
+
+    def __init__(self, text: Text, column: int, row: int, digits: int, color: Color,
+        brightness: Optional[float] = None, value: int = 0, zero_pad: bool = False):
+
+        self._text = text
+        self._screen = text._screen
+        self._column = column
+        self._row = row
+        self._digits = digits
+        self._color = color
+        self._brightness = brightness
+        self._zero_pad = zero_pad
+        self._max_value = 10 ** digits - 1
+
+        font = text._font
+        self._digit_columns = [font.columns[text._glyphs[digit]] for digit in self._DIGITS]
+        self._cell_width = max(len(columns) for columns in self._digit_columns) + 1
+
+        self._value = value
+        self._drawn: List[Optional[Tuple[int, ...]]] = [None] * self.get_width()
+        self.redraw()
+
+    def get_width(self) -> int:
+        return self._digits * self._cell_width - 1
+
+    def get_value(self) -> int:
+        return self._value
+
+    def set_value(self, value: int):
+        self._value = value
+        self._draw()
+
+    def add(self, amount: int = 1):
+        self.set_value(self._value + amount)
+
+    def set_color(self, color: Color):
+        self._color = color
+        self.redraw()
+
+    def redraw(self):
+        self._drawn = [None] * self.get_width()
+        self._draw()
+
+    def _get_columns(self) -> List[Tuple[int, ...]]:
+        value = between_int(self._value, 0, self._max_value)
+        if self._zero_pad:
+            digits = str(value).rjust(self._digits, "0")
+        else:
+            digits = str(value).rjust(self._digits)
+
+        lit = self._color.value
+        off = Color.OFF.value
+        height = self._text.font_height
+
+        columns: List[Tuple[int, ...]] = []
+        for digit in digits:
+            glyph = self._digit_columns[int(digit)] if digit != " " else []
+            for glyph_column in range(self._cell_width):
+                mask = glyph[glyph_column] if glyph_column < len(glyph) else 0
+                columns.append(tuple(lit if mask & (1 << row) else off for row in range(height)))
+
+        return columns[:self.get_width()]
+
+    def _draw(self):
+        points: List[Tuple[int, int, int]] = []
+        for column, column_values in enumerate(self._get_columns()):
+            if self._drawn[column] == column_values:
+                continue
+
+            self._drawn[column] = column_values
+            for row, color_value in enumerate(column_values):
+                points.append((column, row, color_value))
+
+        if len(points) > 0:
+            self._screen.draw_points(self._column, self._row, points, self._brightness)
@@ -0,0 +1,102 @@
+import threading
+from typing import Iterable, Optional
+from lib.colors import *
+from lib.pixels import *
+
+class ThreadedPixels(Pixels):
+    _CLOSE_TIMEOUT = 1
+
+    def __init__(self, pixels: Pixels):
+        super().__init__(pixels._base_brightness, pixels._max_brightness,
+            pixels._relative_brightness)
+
+        self._pixels = pixels
+        self._frame = FrameBuffer(pixels.get_num_columns(), pixels.get_num_rows())
+        self._pending = FrameBuffer(pixels.get_num_columns(), pixels.get_num_rows())
+        self._output = FrameBuffer(pixels.get_num_columns(), pixels.get_num_rows())
+        self._has_pending = False
+        self._running = True
+        self._busy = False
+        self._condition = threading.Condition()
+        self._output_lock = threading.Lock()
+
+        self.submitted_frames = 0
+        self.shown_frames = 0
+        self.dropped_frames = 0
+
+        self._thread = threading.Thread(target = self._output_thread, daemon = True)
+        self._thread.start()
+
+    def get_num_columns(self) -> int:
+        return self._pixels.get_num_columns()
+
+    def get_num_rows(self) -> int:
+        return self._pixels.get_num_rows()
+
+    def set_brightness(self, base_brightness: Optional[int] = None,
+        max_brightness: Optional[int] = None, relative_brightness: Optional[float] = None):
+
+        super().set_brightness(base_brightness, max_brightness, relative_brightness)
+        with self._output_lock:
+            self._pixels.set_brightness(base_brightness, max_brightness, relative_brightness)
+
+    def set_calibration(self, calibration: Calibration):
+        super().set_calibration(calibration)
+        with self._output_lock:
+            self._pixels.set_calibration(calibration)
+
+    def update(self):
+        self._submit()
+
+    def update_region(self, from_column: int, from_row: int, to_column: int, to_row: int):
+        self._submit()
+
+    def fill(self, color: Color, brightness: Optional[float] = None):
+        self._frame.fill(color, brightness)
+
+    def set_pixel(self, column_num: int, row_num: int, color: Color,
+        brightness: Optional[float] = None):
+
+        self._frame.set_pixel(column_num, row_num, color, brightness)
+
+    def blit(self, frame: FrameBuffer, indices: Optional[Iterable[int]] = None):
+        self._frame.copy_from(frame)
+
+    def close(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._has_pending and not self._busy,
+                self._CLOSE_TIMEOUT)
+            self._running = False
+            self._condition.notify_all()
+
+        self._thread.join(self._CLOSE_TIMEOUT)
+        self._pixels.close()
+
+    def _submit(self):
+        with self._condition:
+            if self._has_pending:
+                self.dropped_frames += 1
+            self._pending.copy_from(self._frame)
+            self._has_pending = True
+            self.submitted_frames += 1
+            self._condition.notify_all()
+
+    def _output_thread(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._has_pending or not self._running)
+                if not self._running:
+                    return
+
+                self._pending, self._output = self._output, self._pending
+                self._has_pending = False
+                self._busy = True
+
+            with self._output_lock:
+                self._pixels.blit(self._output)
+                self._pixels.update()
+
+            with self._condition:
+                self._busy = False
+                self.shown_frames += 1
+                self._condition.notify_all()
@@ -0,0 +1,72 @@
+import math
+import os
+import time
+from typing import Optional
+
+WIRE_TIMING_ENV = "LEDPI_WIRE_TIMING"
+WIRE_TIMING_OFF = "off"
+
+class WireTiming:
+    BIT_TIME = 1.25 / 1000000           # WS2812 800 kHz
+    BITS_PER_PIXEL = 24
+    RESET_TIME = 50 / 1000000
+    SPI_BITS_PER_BIT = 8                # SPI bits used to encode one LED bit
+
+    def __init__(self, enabled: bool = True, pixels: Optional[int] = None,
+        bit_time: float = BIT_TIME, bits_per_pixel: int = BITS_PER_PIXEL,
+        reset_time: float = RESET_TIME, spi_buffer_size: Optional[int] = None,
+        spi_bits_per_bit: int = SPI_BITS_PER_BIT, chunk_overhead: float = 0,
+        strips: int = 1):
+
+        self.enabled = enabled
+        self.pixels = pixels
+        self.bit_time = bit_time
+        self.bits_per_pixel = bits_per_pixel
+        self.reset_time = reset_time
+        self.spi_buffer_size = spi_buffer_size
+        self.spi_bits_per_bit = spi_bits_per_bit
+        self.chunk_overhead = chunk_overhead
+        self.strips = strips
+
+        self.frames = 0
+        self.last_transfer_time = 0.0
+        self.total_transfer_time = 0.0
+
+    def transfer_time(self, pixels: Optional[int] = None) -> float:
+        if self.pixels != None:
+            pixels = self.pixels
+        if pixels == None:
+            return 0.0
+
+        strip_pixels = math.ceil(pixels / self.strips)
+        strip_bits = strip_pixels * self.bits_per_pixel
+        transfer_time = strip_bits * self.bit_time + self.reset_time
+
+        if self.spi_buffer_size != None:
+            spi_bytes = math.ceil(strip_bits * self.spi_bits_per_bit / 8)
+            chunks = math.ceil(spi_bytes / self.spi_buffer_size)
+            transfer_time += chunks * self.chunk_overhead
+
+        return transfer_time
+
+    def transfer(self, pixels: Optional[int] = None) -> float:
+        transfer_time = self.transfer_time(pixels)
+
+        self.frames += 1
+        self.last_transfer_time = transfer_time
+        self.total_transfer_time += transfer_time
+
+        if self.enabled and transfer_time > 0:
+            time.sleep(transfer_time)
+
+        return transfer_time
+
+    def get_average_transfer_time(self) -> float:
+        if self.frames == 0:
+            return 0.0
+        return self.total_transfer_time / self.frames
+
+def WireTimingFactory(enabled: bool = True) -> WireTiming:
+    if os.environ.get(WIRE_TIMING_ENV) == WIRE_TIMING_OFF:
+        enabled = False
+    return WireTiming(enabled)
@@ -1,6 +1,8 @@
 #!/usr/bin/python
 
+import importlib
 import os
+import traceback
 from lib.gamepad import *
 from lib.text import *
 from lib.game import *
@@ -8,17 +10,37 @@ from lib.screen import *
 from lib.sound import *
 from lib.config import *
 
-game = GameFactory("data/horizontal.csv", "data/font.csv", "global.cfg", 
+MENU_SETTINGS = GameSettings("global.cfg",
     [Button.BLUE, Button.RED, Button.YELLOW, Button.GREEN])
 
+game = GameFactory("data/horizontal.csv", "data/font.csv", MENU_SETTINGS.config_file,
+    MENU_SETTINGS.sticky_buttons)
+
 games_list = [
-    ["./pong.py", "PONG", ""],
-    ["./snake.py", "SNAKE", ""],
-    ["./shooter.py", "SPACE", "INVADE"],
-    ["./frogger.py", "FROG", ""],
-    ["./pacman.py", "PAC", "MAN"]
+    ["pong", "PONG", ""],
+    ["snake", "SNAKE", ""],
+    ["shooter", "SPACE", "INVADE"],
+    ["frogger", "FROG", ""],
+    ["pacman", "PAC", "MAN"]
     ]
 
+def launch(name: str):
+    module = importlib.import_module(name)
+    start = getattr(module, "start", None)
+    settings = getattr(module, "SETTINGS", None)
+
+    if start == None or settings == None:
+        os.system("./" + name + ".py menu >> menu.out 2>&1")
+        return
+
+    game.configure(settings)
+    try:
+        start(game)
+    except Exception:
+        traceback.print_exc()
+    finally:
+        game.configure(MENU_SETTINGS)
+
 list_index = 0
 last_game = games_list.__len__() - 1
 print(last_game)
@@ -27,8 +49,7 @@ try:
         game.text.write([[games_list[list_index][1] , Color.WHITE], [games_list[list_index][2] , Color.WHITE]])
         game.screen.update()
 
-        game.gamepad.wait_any_button()
-        current_button = game.gamepad.get_one()
+        current_button = game.gamepad.wait_any_button()
 
         if current_button in [Button.HAT_LEFT, Button.L_STICK_LEFT, Button.BLUE]:
             list_index -= 1
@@ -41,10 +62,10 @@ try:
                 list_index = 0
 
         elif current_button == Button.GREEN:
-            os.system(games_list[list_index][0] + " menu >> menu.out 2>&1")
+            launch(games_list[list_index][0])
             game.screen.clear()
             game.gamepad.wait_any_button()
 except KeyboardInterrupt:
     pass
 
-game.stop()
\ No newline at end of file
+game.stop()
@@ -11,6 +11,13 @@ from lib.config import *
 from lib.game import *
 from lib.util import *
 
+SETTINGS = GameSettings("pacman.cfg", [
+    Button.BLUE, Button.HAT_LEFT, Button.L_STICK_LEFT, Button.R_STICK_LEFT,
+    Button.RED, Button.HAT_RIGHT, Button.L_STICK_RIGHT, Button.R_STICK_RIGHT,
+    Button.YELLOW, Button.HAT_UP, Button.L_STICK_UP, Button.R_STICK_UP,
+    Button.GREEN, Button.HAT_DOWN, Button.L_STICK_DOWN, Button.R_STICK_DOWN
+    ], "data/sprites.csv", brightness = 1)
+
 class Pacman:
     def __init__(self, game: Game):
         self._game = game
@@ -138,7 +145,7 @@ class Ghost:
                         continue
                     return
             
-def count_pellets():
+def count_pellets(game: Game):
     num_pellets = 0
     for row in range(game.screen.pixels.get_num_rows()):
         for column in range(game.screen.pixels.get_num_columns()):
@@ -146,13 +153,9 @@ def count_pellets():
                 num_pellets += 1
     return(num_pellets)
 
-if __name__ == '__main__':
-    game = GameFactory("data/horizontal.csv", "data/font.csv", "pacman.cfg", [
-        Button.BLUE, Button.HAT_LEFT, Button.L_STICK_LEFT, Button.R_STICK_LEFT,
-        Button.RED, Button.HAT_RIGHT, Button.L_STICK_RIGHT, Button.R_STICK_RIGHT,
-        Button.YELLOW, Button.HAT_UP, Button.L_STICK_UP, Button.R_STICK_UP,
-        Button.GREEN, Button.HAT_DOWN, Button.L_STICK_DOWN, Button.R_STICK_DOWN
-        ], "data/sprites.csv", brightness= 1)
+def start(game: Game):
+    global pacman, walls
+
     game.gamepad.set_sticky_button(Button.RED)
     pacman = Pacman(game)
     ghosts = [Ghost(game, 9, 5, SpriteID.BLINKY), 
@@ -163,7 +166,7 @@ if __name__ == '__main__':
 
     game.screen.fill(Color.BLUE, .1)
 
-    walls = [wall]
+    walls = OccupancyGrid(game.screen, [wall])
     for ghost in ghosts:
         walls.append(ghost.sprite)
     #    ghost.sprite.draw(brightness= 1)
@@ -173,7 +176,7 @@ if __name__ == '__main__':
     pacman.sprite.draw()
     game.screen.update()
 
-    totalpellets = count_pellets()
+    totalpellets = count_pellets(game)
     clock = 1
     scatter = True
     reverse = False
@@ -193,14 +196,20 @@ if __name__ == '__main__':
 
         for ghost in ghosts:
             if ghost.sprite.is_colliding(pacman.sprite):
-                game.show_game_over(totalpellets - count_pellets())
-                sys.exit()
+                game.show_game_over(totalpellets - count_pellets(game))
+                return
 
             ghost.move(scatter, reverse)
 
             if ghost.sprite.is_colliding(pacman.sprite):
-                game.show_game_over(totalpellets - count_pellets())
-                sys.exit()
+                game.show_game_over(totalpellets - count_pellets(game))
+                return
 
         game.screen.update()
-        time.sleep(.3)
\ No newline at end of file
+        time.sleep(.3)
+
+if __name__ == '__main__':
+    GameLauncher(
+        GameFactory("data/horizontal.csv", "data/font.csv", SETTINGS.config_file,
+            SETTINGS.sticky_buttons, SETTINGS.sprite_def, SETTINGS.brightness),
+        start)
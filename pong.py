@@ -9,7 +9,6 @@ import math
 from threading import Thread
 
 from lib.screen import *
-from lib.led_pixels import *
 from lib.gamepad import *
 from lib.sound import *
 from lib.text import *
@@ -18,6 +17,8 @@ from lib.game import *
 
 is_debug = True
 
+SETTINGS = GameSettings("pong.cfg")
+
 def debug(message):
     if is_debug:
         print(message) 
@@ -125,64 +126,67 @@ class Ball:
 
 ##########################################################################################################
 
-score = 0
-end_game_flag = False
-win_flag = False
+def start(game: Game):
+    global screen, score, end_game_flag, win_flag, left_paddle, right_paddle, ball
 
-screen = Screen(LEDPixels("data/horizontal.csv"))
-gamepad = Gamepad(0)
-config = Config("pong.cfg")
-text = Text("data/font.csv", screen)
-sound = SoundFactory(config.get_int("volume", 100), config.get_bool("muted", False))
-game = Game(screen, text, gamepad, sound, config)
+    score = 0
+    end_game_flag = False
+    win_flag = False
 
-left_paddle = Paddle(0, round(screen.pixels.get_num_rows() / 2))
-right_paddle = Paddle(screen.pixels.get_num_columns()-1, round(screen.pixels.get_num_rows() / 2))
-ball = Ball(screen.pixels.get_num_columns() / 1.5 , screen.pixels.get_num_rows() / 2, secrets.randbelow(40) - 20, Color.RED)
-ball_thread = Thread(target=ball.ball_thread)
+    screen = game.screen
+    gamepad = game.gamepad
 
-try:
-    left_paddle.show()
-    right_paddle.show()
-    ball.show()
+    left_paddle = Paddle(0, round(screen.pixels.get_num_rows() / 2))
+    right_paddle = Paddle(screen.pixels.get_num_columns()-1, round(screen.pixels.get_num_rows() / 2))
+    ball = Ball(screen.pixels.get_num_columns() / 1.5 , screen.pixels.get_num_rows() / 2, secrets.randbelow(40) - 20, Color.RED)
+    ball_thread = Thread(target=ball.ball_thread)
 
-    paddle_speed = .1
+    try:
+        left_paddle.show()
+        right_paddle.show()
+        ball.show()
 
-    ball_thread.start()
+        paddle_speed = .1
 
-    while True:
-        current_direction = gamepad.get_one()
+        ball_thread.start()
 
-        if current_direction == Button.YELLOW:
-            left_paddle.up()
-        elif current_direction == Button.GREEN:
-            left_paddle.down()
+        while True:
+            current_direction = gamepad.get_one()
 
-        if ball.y_coordinate > right_paddle.y_coordinate + 1:
-            right_paddle.down()
-        if ball.y_coordinate < right_paddle.y_coordinate + 1:
-            right_paddle.up()
+            if current_direction == Button.YELLOW:
+                left_paddle.up()
+            elif current_direction == Button.GREEN:
+                left_paddle.down()
 
-        while(ball.update_flag == True):
-            time.sleep(.001)
-        screen.update()
+            if ball.y_coordinate > right_paddle.y_coordinate + 1:
+                right_paddle.down()
+            if ball.y_coordinate < right_paddle.y_coordinate + 1:
+                right_paddle.up()
 
-        if end_game_flag:
-            time.sleep(1)
+            while(ball.update_flag == True):
+                time.sleep(.001)
+            screen.update()
 
-            ball_thread.join()
+            if end_game_flag:
+                time.sleep(1)
+
+                ball_thread.join()
 
-            screen.clear()
+                screen.clear()
 
-            game.show_win_lose(win_flag, score)
+                game.show_win_lose(win_flag, score)
 
-            exit()
+                return
 
-        time.sleep(paddle_speed)
+            time.sleep(paddle_speed)
 
-except KeyboardInterrupt:
-    ball.thread_flag = False
-    ball_thread.join()
+    finally:
+        ball.thread_flag = False
+        if ball_thread.is_alive():
+            ball_thread.join()
 
-    screen.clear()
-    pass
\ No newline at end of file
+if __name__ == '__main__':
+    GameLauncher(
+        GameFactory("data/horizontal.csv", "data/font.csv", SETTINGS.config_file,
+            SETTINGS.sticky_buttons),
+        start)
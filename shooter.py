@@ -7,9 +7,13 @@ CONTROL_LEFT  = [Button.L_STICK_LEFT, Button.HAT_LEFT, Button.KEY_LEFT]
 CONTROL_RIGHT = [Button.L_STICK_RIGHT, Button.HAT_RIGHT, Button.KEY_RIGHT]
 CONTROL_SHOOT = [Button.GREEN, Button.RED, Button.YELLOW, Button.BLUE, Button.KEY_L_SHIFT]
 
+SETTINGS = GameSettings("shooter.cfg", [], "data/sprites.csv")
+
 class Shooter:
     _DOWN_MOVE_FREQ = 50
     _ENEMY_OUTSIDE_WALL = 20
+    _MAX_PLAYER_BULLETS = 1
+    _MAX_ENEMY_BULLETS = 1
 
     def __init__(self, game: Game):
         self._game = game
@@ -23,7 +27,7 @@ class Shooter:
         self.powerup_sound = game.sound.get(SoundSample.POWERUP)
 
         self._move_num = 1
-        self._delay = 1 / 20
+        self._tick_rate = 20
         self._score = 0
         self._random_direction = MoveDirection.UP
 
@@ -31,9 +35,6 @@ class Shooter:
         self.create_enemies(game, screen)
         screen.update()
 
-    def step_delay(self):
-        time.sleep(self._delay)
-
     def create_player(self, game: Game, screen: Screen):
         player = game.sprites.get(SpriteID.SHIP)
         self._player = player
@@ -42,16 +43,19 @@ class Shooter:
             int(screen.pixels.get_num_columns() / 2), 
             screen.pixels.get_num_rows() - player.get_height())
 
-        self._player_shooting = False
-        self._player_bullet = game.sprites.get(SpriteID.BULLET)
+        self._player_bullets = ProjectilePool(screen, game.sprites.get(SpriteID.BULLET),
+            self._MAX_PLAYER_BULLETS)
+        self._player_rockets = ProjectilePool(screen, game.sprites.get(SpriteID.ROCKET),
+            self._MAX_PLAYER_BULLETS, brightness = 2)
+        self._enemy_hits: List[Sprite] = []
 
     def create_enemies(self, game: Game, screen: Screen):
-        self._enemies: List[Sprite] = []
+        self._enemies = OccupancyGrid(screen)
         self._enemy_groups: List[List[Sprite]] = []
         self._enemy_directions: List[MoveDirection] = []
-        self._enemy_bullet = game.sprites.get(SpriteID.ENEMY_BULLET)
-        self._enemy_bullet.set_brightness(2)
-        self._enemy_shooting = False
+        self._enemy_bullets = ProjectilePool(screen, game.sprites.get(SpriteID.ENEMY_BULLET),
+            self._MAX_ENEMY_BULLETS, brightness = 2)
+        self._player_hit = False
 
         row = 0
         enemy_direction = MoveDirection.RIGHT
@@ -89,57 +93,62 @@ class Shooter:
             row += height
 
     def move(self):
-        game = self._game
-        screen = game.screen
-        player_bullet = self._player_bullet
-        enemy_bullet = self._enemy_bullet
-
-        self.move_bullets(screen, player_bullet, enemy_bullet)
-        self.move_player(game.sound, self._player, player_bullet)
-        self.move_enemy(enemy_bullet)
-        screen.update()
+        self.move_bullets()
+        self.move_player(self._player)
+        self.move_enemy()
 
         self._move_num += 1
 
-    def move_player(self, sound: Sound, player: Sprite, player_bullet: Sprite):
+    def tick(self) -> bool:
+        self.move()
+        return self.detect()
+
+    def run(self):
+        GameLoop(self.tick, self._game.screen.update, self._tick_rate).run()
+
+    def is_player_shooting(self) -> bool:
+        return self.get_player_shots() > 0
+
+    def get_player_shots(self) -> int:
+        return len(self._player_bullets) + len(self._player_rockets)
+
+    def move_player(self, player: Sprite):
         buttons = self._game.gamepad.get_all()
         for button in buttons:
             if button in CONTROL_LEFT:
                 player.move(MoveDirection.LEFT)  
             elif button in CONTROL_RIGHT:
                 player.move(MoveDirection.RIGHT)
-            elif button in CONTROL_SHOOT and not self._player_shooting:
+            elif button in CONTROL_SHOOT:
+                if self.get_player_shots() >= self._MAX_PLAYER_BULLETS:
+                    continue
+
                 if len(self._enemies) <= 5:
-                    self.rocket_sound.play()
-                    self._player_bullet = self._game.sprites.get(SpriteID.ROCKET)
-                    player_bullet = self._player_bullet
-                    player_bullet.set_brightness(2)
+                    bullets = self._player_rockets
+                    sound = self.rocket_sound
                 else:
-                    self.shoot_sound.play()
+                    bullets = self._player_bullets
+                    sound = self.shoot_sound
 
+                sound.play()
                 column, row = player.get_middle_position()
-                column = column - int(player_bullet.get_width() / 2)
-                player_bullet.set_position(column, row - player_bullet.get_height())
+                column = column - int(bullets.get_width() / 2)
+                bullets.fire(column, row - bullets.get_height(), 0, -1)
                 player.transform(0)
-                self._player_shooting = True
-
-    def move_bullets(self, screen: Screen, player_bullet: Sprite, enemy_bullet: Sprite):
-        if self._player_shooting:
-            if player_bullet.get_row() < 0:
-                player_bullet.erase()
-                self._player.transform(1)
-                self._player_shooting = False
-            if self._player_shooting:
-                player_bullet.move(MoveDirection.UP, outside = 1, pulsate = True)
-        
-        if self._enemy_shooting:
-            if enemy_bullet.get_row() > screen.last_row:
-                enemy_bullet.erase()
-                self._enemy_shooting = False
-            if self._enemy_shooting:
-                enemy_bullet.move(MoveDirection.DOWN, outside = 1, pulsate = True)
-
-    def move_enemy(self, enemy_bullet: Sprite):
+
+    def move_bullets(self):
+        was_shooting = self.is_player_shooting()
+        for bullets in [self._player_bullets, self._player_rockets]:
+            for _, enemy in bullets.step(self._enemies, pulsate = True):
+                self._enemy_hits.append(enemy)
+
+        if was_shooting and not self.is_player_shooting() and len(self._enemy_hits) == 0:
+            self._player.transform(1)
+
+        if len(self._enemy_bullets.step([self._player], pulsate = True)) > 0:
+            self._player_hit = True
+
+    def move_enemy(self):
         outside_wall = self._ENEMY_OUTSIDE_WALL
         enemy_directions = self._enemy_directions
         enemies = self._enemies
@@ -166,7 +175,7 @@ class Shooter:
                 for enemy in self._enemies:
                     enemy.move(MoveDirection.DOWN, pulsate = True)
 
-        if not self._enemy_shooting:
+        if not self._enemy_bullets.is_full():
             visible_enemies: List[Sprite] = []
             for enemy in enemies:
                 if enemy.on_screen():
@@ -175,8 +184,7 @@ class Shooter:
             if len(visible_enemies) != 0:
                 enemy = visible_enemies[secrets.randbelow(len(visible_enemies))]
                 column, row = enemy.get_middle_position()
-                enemy_bullet.set_position(column, row + enemy.get_height())
-                self._enemy_shooting = True
+                self._enemy_bullets.fire(column, row + enemy.get_height(), 0, 1)
 
     def detect(self) -> bool:
         game = self._game
@@ -189,16 +197,17 @@ class Shooter:
             self._game.show_win_lose(True, self._score)
             return True
 
-        self.detect_enemy_kills(screen, sound, player, enemies, self._player_bullet)
-        killed = self.detect_player_kill(screen, sound, player, enemies, self._enemy_bullet)
+        self.detect_enemy_kills(screen, sound, player, enemies)
+        killed = self.detect_player_kill(screen, sound, player, enemies)
         return killed
 
     def detect_player_kill(self, screen: Screen, sound: Sound, player: Sprite, 
-        enemies: List[Sprite], enemy_bullet: Sprite) -> bool:
+        enemies: OccupancyGrid) -> bool:
 
-        colisions = player.get_collisions(enemies)
+        if len(self._enemy_bullets.collide([player])) > 0:
+            self._player_hit = True
 
-        if (len(colisions) > 0) or player.is_colliding(enemy_bullet):
+        if player.any_collision(enemies) or self._player_hit:
             self.big_explosion_sound.play()
             player.draw(Color.RED, brightness = -1)
             screen.update()
@@ -214,10 +223,18 @@ class Shooter:
         return False
 
     def detect_enemy_kills(self, screen: Screen, sound: Sound, player: Sprite,
-        enemies: List[Sprite], player_bullet: Sprite):
+        enemies: OccupancyGrid):
+
+        colisions = self._enemy_hits
+        self._enemy_hits = []
+        for bullets in [self._player_bullets, self._player_rockets]:
+            for _, enemy in bullets.collide(enemies):
+                colisions.append(enemy)
 
-        colisions = player_bullet.get_collisions(enemies)
         for enemy in colisions:
+            if enemy not in enemies:
+                continue
+
             if len(enemies) == 6:
                 self.powerup_sound.play()
             else:
@@ -234,22 +251,17 @@ class Shooter:
                     if enemy == check_enemy:
                         enemy_group.remove(check_enemy)
 
-            player_bullet.erase()
-            player.transform(1)
+            if not self.is_player_shooting():
+                player.transform(1)
             screen.update()
-            self._player_shooting = False
             self._score += 1
 
 def start(game: Game):
     shooter = Shooter(game)
-
-    while True:
-        shooter.move()
-        if shooter.detect():
-            break
-        shooter.step_delay()
+    shooter.run()
 
 if __name__ == '__main__':
     GameLauncher(
-        GameFactory("data/horizontal.csv", "data/font.csv", "shooter.cfg", [], "data/sprites.csv"), 
+        GameFactory("data/horizontal.csv", "data/font.csv", SETTINGS.config_file,
+            SETTINGS.sticky_buttons, SETTINGS.sprite_def), 
         start)
@@ -8,6 +8,8 @@ CONTROL_DOWN  = [Button.L_STICK_DOWN, Button.HAT_DOWN, Button.GREEN, Button.KEY_
 CONTROL_LEFT  = [Button.L_STICK_LEFT, Button.HAT_LEFT, Button.BLUE, Button.KEY_LEFT]
 CONTROL_RIGHT = [Button.L_STICK_RIGHT, Button.HAT_RIGHT, Button.RED, Button.KEY_RIGHT]
 
+SETTINGS = GameSettings("snake.cfg", CONTROL_UP + CONTROL_DOWN + CONTROL_LEFT + CONTROL_RIGHT)
+
 class Snake:
     _delay = 0.5
     _snake_colors = [Color.GREEN, Color.BLUE, Color.RED]
@@ -49,9 +51,6 @@ class Snake:
         screen.set_pixel(apple_column, apple_row, Color.RED)
         self._apple = [apple_column, apple_row]
 
-    def step_delay(self):
-        time.sleep(self._delay)
-
     def detect(self):
         apple = self._apple
         snake_head = self._snake[0]
@@ -108,8 +107,6 @@ class Snake:
         for n, segment in enumerate(snake):
             screen.set_pixel(segment[0], segment[1], colors[n % len(colors)])    
 
-        screen.update()
-
         for segment in snake[1:]:
             if new_column == segment[0] and new_row == segment[1]:
                 self._game.show_game_over(self._score)
@@ -117,22 +114,24 @@ class Snake:
 
         return False
 
+    def tick(self) -> bool:
+        if self.move():
+            return True
+
+        self.detect()
+        self._loop.set_tick_rate(1 / self._delay)
+        return False
+
+    def run(self):
+        self._loop = GameLoop(self.tick, self._game.screen.update, 1 / self._delay)
+        self._loop.run()
+
 def start(game: Game):
     snake = Snake(game)
-
-    while True:
-        if snake.move():
-            break
-        snake.detect()
-        snake.step_delay()
+    snake.run()
 
 if __name__ == '__main__':
-    controls = []
-    controls.extend(CONTROL_UP)
-    controls.extend(CONTROL_DOWN)
-    controls.extend(CONTROL_LEFT)
-    controls.extend(CONTROL_RIGHT)
-
     GameLauncher(
-        GameFactory("data/horizontal.csv", "data/font.csv", "snake.cfg", controls), 
+        GameFactory("data/horizontal.csv", "data/font.csv", SETTINGS.config_file,
+            SETTINGS.sticky_buttons), 
         start)